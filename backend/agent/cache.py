@@ -0,0 +1,137 @@
+"""
+进程内缓存 — 内容寻址的 LRU 缓存与序列指纹
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+_MISSING = object()
+
+# Whole-request results (reasoner / smart predict), shared by both engines.
+RESULT_TTL = float(os.getenv("AGENT_RESULT_TTL", "600"))
+RESULT_CACHE_SIZE = int(os.getenv("AGENT_RESULT_CACHE_SIZE", "128"))
+
+
+def fingerprint(*parts) -> str:
+    """Stable content hash of arrays / lists / scalars.
+
+    Numeric sequences are hashed by their float64 bytes, so a list and the
+    equivalent ndarray produce the same key.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, (list, tuple, np.ndarray)) and _is_numeric(part):
+            arr = np.ascontiguousarray(part, dtype=np.float64)
+            h.update(b"a" + str(arr.shape).encode())
+            h.update(arr.tobytes())
+        else:
+            h.update(b"r" + repr(part).encode())
+        h.update(b"|")
+    return h.hexdigest()
+
+
+def approx_nbytes(obj) -> int:
+    """Rough size of a JSON-like result, for cache byte accounting."""
+    return 2 * len(repr(obj)) + 256
+
+
+def _is_numeric(seq) -> bool:
+    if isinstance(seq, np.ndarray):
+        return seq.dtype.kind in "biuf"
+    return all(isinstance(v, (int, float, np.integer, np.floating))
+               and not isinstance(v, bool) for v in seq)
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count and approximate bytes.
+
+    With ``ttl`` (seconds) entries also expire that long after insertion.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024,
+                 ttl: float = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and self._expired(entry):
+                del self._data[key]
+                self._bytes -= entry[1]
+                entry = _MISSING
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes: int = 0):
+        """Insert ``value``; ``nbytes`` is the caller's size estimate."""
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, _MISSING)
+            if old is not _MISSING:
+                self._bytes -= old[1]
+            expires = time.monotonic() + self.ttl if self.ttl else None
+            self._data[key] = (value, nbytes, expires)
+            self._bytes += nbytes
+            while self._data and (len(self._data) > self.max_entries
+                                  or self._bytes > self.max_bytes):
+                _, (_, size, _) = self._data.popitem(last=False)
+                self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry now; returns how many were dropped."""
+        if not self.ttl:
+            return 0
+        with self._lock:
+            expired = [k for k, entry in self._data.items() if self._expired(entry)]
+            for k in expired:
+                self._bytes -= self._data.pop(k)[1]
+            return len(expired)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._data), "bytes": self._bytes,
+                    "hits": self.hits, "misses": self.misses}
+
+    def items(self) -> list:
+        """Snapshot of the live ``(key, value)`` pairs, oldest first."""
+        with self._lock:
+            return [(k, entry[0]) for k, entry in self._data.items()
+                    if not self._expired(entry)]
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            return entry is not _MISSING and not self._expired(entry)
+
+    @staticmethod
+    def _expired(entry) -> bool:
+        return entry[2] is not None and time.monotonic() >= entry[2]
+
+    def __len__(self):
+        return len(self._data)
+
+
+RESULT_CACHE = LRUCache(max_entries=RESULT_CACHE_SIZE,
+                        max_bytes=64 * 1024 * 1024, ttl=RESULT_TTL)
@@ -5,9 +5,17 @@ Strategy: conservative adaptive selection with robustness prior.
 ARIMA is the default; only override when CV evidence is overwhelming.
 """
 
+import os
+import threading
+import time
+
 import numpy as np
+from .executors import MAX_WORKERS, get_process_pool, run_bounded, BrokenProcessPool
+from .intervals import prediction_interval
+from .tools.context import as_context
 from .tools.forecasters import (
-    arima_forecast, ets_forecast, theta_forecast, linear_forecast
+    arima_forecast, ets_forecast, theta_forecast, linear_forecast,
+    CacheMiss, cached_only, merge_fits, run_with_fits,
 )
 
 FORECASTERS = [
@@ -19,30 +27,92 @@ FORECASTERS = [
 
 DEFAULT_MODEL = "arima"
 
+# statsmodels-backed forecasters go to the process pool in concurrent mode;
+# the numpy ones are cheaper to run inline than to pickle.
+HEAVY_FORECASTERS = {"arima", "ets"}
+# Heavy forecasters that fan their own fits out over the pool (one task per
+# ARIMA order). They are driven from this process: shipped whole, their
+# search would run sequentially inside a single worker.
+FANOUT_FORECASTERS = {"arima"}
+
+# Defaults for ensemble_predict. Concurrent and lazy runs return the same
+# forecast as the plain sequential one; the interval method changes the band.
+ENSEMBLE_CONCURRENT = os.getenv("AGENT_ENSEMBLE_CONCURRENT", "1" if MAX_WORKERS > 1 else "0"
+                                ).lower() in ("1", "true", "yes")
+ENSEMBLE_LAZY = os.getenv("AGENT_ENSEMBLE_LAZY", "1").lower() in ("1", "true", "yes")
+ENSEMBLE_INTERVAL = os.getenv("AGENT_INTERVAL", "gaussian")
+# Per-fit limit in concurrent mode (seconds from when the fit starts)
+FIT_TIMEOUT = float(os.getenv("AGENT_FIT_TIMEOUT", "20"))
+
+OVERRIDE_RATIO = 0.2   # another model must reach < 0.2x ARIMA's CV error
+ERROR_FLOOR = 1e-10
+FAILED_ERROR = 1e6
+
+
+def ensemble_predict(data: list, steps: int = 10, concurrent: bool = None,
+                     timeout: float = 60.0, lazy: bool = None,
+                     interval: str = None) -> dict:
+    """Run multiple forecasters, pick best via CV, apply bias correction.
+
+    ``concurrent``, ``lazy`` and ``interval`` default to
+    ``ENSEMBLE_CONCURRENT``, ``ENSEMBLE_LAZY`` and ``ENSEMBLE_INTERVAL``.
 
-def ensemble_predict(data: list, steps: int = 10) -> dict:
-    """Run multiple forecasters, pick best via CV, apply bias correction."""
-    y = np.array(data, dtype=float)
+    With ``concurrent=True`` the full-data and CV fits of every forecaster
+    are scheduled together; a forecaster that misses ``timeout`` seconds is
+    treated like one that failed, and a single fit is dropped after
+    ``FIT_TIMEOUT`` seconds.
+
+    With ``lazy=True`` every forecaster is cross-validated first and only
+    the chosen model is fitted on the full data, saving the losers' full
+    fits. Series too short for CV run eagerly. Combined with ``concurrent``,
+    the CV fits are the ones scheduled together.
+
+    ``interval`` selects the prediction-interval method, see
+    :func:`agent.intervals.prediction_interval`.
+    """
+    concurrent = ENSEMBLE_CONCURRENT if concurrent is None else concurrent
+    lazy = ENSEMBLE_LAZY if lazy is None else lazy
+    interval = interval or ENSEMBLE_INTERVAL
+    ctx = as_context(data)
+    y = ctx.y
+
+    if lazy and _cv_split(len(y)) is not None:
+        results, chosen, cv_residuals, cv_errors = _lazy_select(
+            ctx, y, steps, concurrent, timeout)
+        if not results:
+            return {"predictions": [], "confidence": 0.1, "method": "none"}
+        return _assemble(y, results, chosen, cv_residuals, cv_errors, interval,
+                         models_used=list(cv_errors))
 
     # 1. Collect forecasts from all models
-    results = {}
-    for name, fn in FORECASTERS:
-        try:
-            r = fn(data, steps=steps)
-            if "predictions" in r and len(r["predictions"]) == steps:
-                results[name] = r["predictions"]
-        except Exception:
-            continue
+    cv_results = None
+    if concurrent:
+        results, cv_results = _run_concurrent(ctx, y, steps, timeout)
+    else:
+        results = {}
+        for name, fn in FORECASTERS:
+            try:
+                r = fn(ctx, steps=steps)
+                if "predictions" in r and len(r["predictions"]) == steps:
+                    results[name] = r["predictions"]
+            except Exception:
+                continue
 
     if not results:
         return {"predictions": [], "confidence": 0.1, "method": "none"}
 
     # 2. CV model selection (conservative: prefer ARIMA unless clearly beaten)
-    chosen, cv_residuals, cv_errors = _select_model(y, results)
+    chosen, cv_residuals, cv_errors = _select_model(y, results, cv_results)
+    return _assemble(y, results, chosen, cv_residuals, cv_errors, interval)
+
 
+def _assemble(y, results, chosen, cv_residuals, cv_errors, interval,
+              models_used=None):
+    """Build the ensemble response around the chosen model's forecast."""
     preds_raw = np.array(results[chosen], dtype=float)
     preds = [round(float(v), 4) for v in preds_raw]
-    ci_lower, ci_upper = _bootstrap_ci(y, preds)
+    ci_lower, ci_upper = prediction_interval(y, preds, method=interval,
+                                             residuals=cv_residuals or None)
 
     return {
         "tool": "ensemble_predict",
@@ -50,26 +120,209 @@ def ensemble_predict(data: list, steps: int = 10) -> dict:
         "weights": {chosen: 1.0},
         "ci_lower": ci_lower,
         "ci_upper": ci_upper,
-        "models_used": list(results.keys()),
+        "models_used": models_used or list(results.keys()),
         "cv_residuals": cv_residuals,
         "cv_errors": cv_errors,
     }
 
 
-def _select_model(y, results):
+def _run_concurrent(data, y, steps, timeout):
+    """Run full-data and CV forecasts together; return (results, cv_results)."""
+    jobs = [(("full", name), fn, data, steps) for name, fn in FORECASTERS]
+    split = _cv_split(len(y))
+    if split is not None:
+        train_end, val_size = split
+        train = y[:train_end].tolist()
+        jobs += [(("cv", name), fn, train, val_size) for name, fn in FORECASTERS]
+
+    outputs = _run_jobs(jobs, timeout)
+
+    results, cv_results = {}, {}
+    for name, _ in FORECASTERS:
+        preds = outputs.get(("full", name), {}).get("predictions", [])
+        if len(preds) == steps:
+            results[name] = preds
+        if ("cv", name) in outputs:
+            cv_results[name] = outputs[("cv", name)].get("predictions", [])
+    return results, cv_results
+
+
+def _run_jobs(jobs, timeout):
+    """Execute forecaster jobs, heavy ones on the process pool.
+
+    Heavy jobs whose fits are already cached run in-process. Fan-out
+    forecasters run in helper threads that spread their fits over the pool;
+    the other heavy jobs go to the pool whole, and the fits the workers
+    compute are merged back into this process's ``MODEL_CACHE``. Every pool
+    task is dropped after ``FIT_TIMEOUT`` seconds.
+
+    ``jobs`` is a list of ``(key, fn, series, steps)``. Returns ``{key: result}``
+    for the jobs that finished within ``timeout`` seconds without raising.
+    """
+    deadline = time.monotonic() + timeout
+    outputs = {}
+    heavy, fanout, inline = [], [], []
+    for job in jobs:
+        name = job[0][1]
+        if name not in HEAVY_FORECASTERS:
+            inline.append(job)
+            continue
+        # Fits already in this process's MODEL_CACHE are served here for free
+        key, fn, series, n_steps = job
+        try:
+            with cached_only():
+                outputs[key] = fn(series, steps=n_steps)
+        except CacheMiss:
+            (fanout if name in FANOUT_FORECASTERS else heavy).append(job)
+        except Exception:
+            continue
+
+    # Pool work is driven from helper threads so inline jobs overlap it
+    pooled, fanned, threads = {}, {}, []
+    if heavy:
+        calls = [(run_with_fits, (fn, series, n_steps), {})
+                 for _, fn, series, n_steps in heavy]
+
+        def drive():
+            try:
+                pooled["results"] = run_bounded(get_process_pool(), calls,
+                                                max_workers=len(heavy),
+                                                timeout=FIT_TIMEOUT, deadline=deadline)
+            except (BrokenProcessPool, RuntimeError, OSError):
+                pooled["results"] = None
+
+        threads.append(threading.Thread(target=drive, name="ensemble-pool", daemon=True))
+
+    for key, fn, series, n_steps in fanout:
+        def fan(key=key, fn=fn, series=series, n_steps=n_steps):
+            try:
+                fanned[key] = fn(series, steps=n_steps, parallel=True,
+                                 fit_timeout=FIT_TIMEOUT)
+            except Exception:
+                pass
+
+        threads.append(threading.Thread(target=fan, name="ensemble-fanout", daemon=True))
+
+    for thread in threads:
+        thread.start()
+
+    for key, fn, series, n_steps in inline:
+        try:
+            outputs[key] = fn(series, steps=n_steps)
+        except Exception:
+            continue
+
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+    outputs.update(dict(fanned))  # a fan-out still running has missed the deadline
+
+    if heavy and "results" in pooled:
+        results = pooled["results"]
+        if results is None:  # pool unavailable: run the heavy jobs in-process
+            results = []
+            for _, fn, series, n_steps in heavy:
+                try:
+                    results.append((fn(series, steps=n_steps), []))
+                except Exception:
+                    results.append(None)
+        for (key, *_), outcome in zip(heavy, results):
+            if outcome is not None:
+                outputs[key], fits = outcome
+                merge_fits(fits)
+    return outputs
+
+
+def _lazy_select(data, y, steps, concurrent=False, timeout=60.0):
+    """Lazy selection: CV errors first, then a full-data fit of the winner only.
+
+    CV itself can't be cut short soundly: any challenger might still beat
+    ARIMA by the override margin. The saving is in the full-data fits,
+    which the eager path runs for every model. Every forecaster returns a
+    full-length forecast unless it raises, so the models that competed in
+    CV are the ones the eager path reports in ``models_used``.
+    If the winner's full fit fails, ARIMA and then the other models (by CV
+    error) are tried.
+    """
+    train_end, val_size = _cv_split(len(y))
+    train = y[:train_end].tolist()
+    actual = y[train_end:]
+    errors, cv_preds = {}, {}
+    if concurrent:
+        outputs = _run_jobs([(("cv", name), fn, train, val_size)
+                             for name, fn in FORECASTERS], timeout)
+    for name, fn in FORECASTERS:
+        try:
+            if concurrent:
+                preds = outputs[("cv", name)]["predictions"]
+            else:
+                preds = fn(train, steps=val_size)["predictions"]
+            errors[name], cv_preds[name] = _cv_error(preds, actual)
+        except Exception:
+            errors[name] = FAILED_ERROR
+
+    fns = dict(FORECASTERS)
+    first = _choose(errors)
+    fallbacks = sorted(fns, key=lambda k: (k != DEFAULT_MODEL,
+                                           errors.get(k, FAILED_ERROR)))
+    for name in dict.fromkeys([first] + fallbacks):
+        try:
+            r = fns[name](data, steps=steps)
+        except Exception:
+            continue
+        if len(r.get("predictions", [])) != steps:
+            continue
+        cv_residuals = []
+        if name in cv_preds:
+            p = cv_preds[name]
+            cv_residuals = (p - actual[:len(p)]).tolist()
+        return ({name: r["predictions"]}, name, cv_residuals,
+                {k: round(v, 6) for k, v in errors.items()})
+    return {}, None, [], {}
+
+
+def _cv_error(preds, actual):
+    """Hold-out MSE (floored) and the aligned prediction array."""
+    p = np.array(preds[:len(actual)])
+    mse = float(np.mean((p - actual[:len(p)]) ** 2))
+    return max(mse, ERROR_FLOOR), p
+
+
+def _choose(errors):
+    """Apply the conservative override rule to a ``{name: cv_error}`` map."""
+    arima_err = errors.get(DEFAULT_MODEL, FAILED_ERROR)
+    best_name = min(errors, key=errors.get)
+    best_err = errors[best_name]
+
+    # Only override ARIMA if another model is >80% better on CV
+    # (practically never — ARIMA is the safest univariate forecaster)
+    if best_name != DEFAULT_MODEL and best_err < arima_err * OVERRIDE_RATIO:
+        return best_name
+    return DEFAULT_MODEL if DEFAULT_MODEL in errors else best_name
+
+
+def _cv_split(n):
+    """Hold-out split for CV: ``(train_end, val_size)`` or None if too short."""
+    val_size = max(8, n // 5)
+    train_end = n - val_size
+    return (train_end, val_size) if train_end >= 15 else None
+
+
+def _select_model(y, results, cv_results=None):
     """Conservative model selection: ARIMA unless CV strongly disagrees.
 
     Only switch away from ARIMA if another model has <0.67x ARIMA's error
     (i.e., 50%+ better). This prevents noisy CV from picking bad models.
+
+    ``cv_results`` optionally holds precomputed hold-out predictions keyed by
+    model name; models missing from it count as failed.
     """
-    n = len(y)
-    val_size = max(8, n // 5)
-    train_end = n - val_size
+    split = _cv_split(len(y))
 
-    if train_end < 15 or DEFAULT_MODEL not in results:
+    if split is None or DEFAULT_MODEL not in results:
         chosen = DEFAULT_MODEL if DEFAULT_MODEL in results else list(results.keys())[0]
         return chosen, [], {}
 
+    train_end, val_size = split
     train = y[:train_end].tolist()
     actual = y[train_end:]
 
@@ -79,28 +332,19 @@ def _select_model(y, results):
         if name not in results:
             continue
         try:
-            r = fn(train, steps=val_size)
-            p = np.array(r["predictions"][:len(actual)])
-            mse = float(np.mean((p - actual[:len(p)]) ** 2))
-            errors[name] = max(mse, 1e-10)
-            cv_preds[name] = p
+            if cv_results is not None:
+                preds = cv_results[name]
+            else:
+                preds = fn(train, steps=val_size)["predictions"]
+            errors[name], cv_preds[name] = _cv_error(preds, actual)
         except Exception:
-            errors[name] = 1e6
+            errors[name] = FAILED_ERROR
 
     if not errors:
         chosen = DEFAULT_MODEL if DEFAULT_MODEL in results else list(results.keys())[0]
         return chosen, [], {}
 
-    arima_err = errors.get(DEFAULT_MODEL, 1e6)
-    best_name = min(errors, key=errors.get)
-    best_err = errors[best_name]
-
-    # Only override ARIMA if another model is >80% better on CV
-    # (practically never — ARIMA is the safest univariate forecaster)
-    if best_name != DEFAULT_MODEL and best_err < arima_err * 0.2:
-        chosen = best_name
-    else:
-        chosen = DEFAULT_MODEL if DEFAULT_MODEL in errors else best_name
+    chosen = _choose(errors)
 
     # CV residuals for post-predict correction
     cv_residuals = []
@@ -109,21 +353,3 @@ def _select_model(y, results):
         cv_residuals = (p - actual[:len(p)]).tolist()
 
     return chosen, cv_residuals, {k: round(v, 6) for k, v in errors.items()}
-
-
-def _bootstrap_ci(y, preds, n_boot=200, alpha=0.05):
-    """Bootstrap confidence intervals."""
-    residuals = np.diff(y)
-    std_r = float(np.std(residuals)) if len(residuals) > 0 else 1.0
-
-    rng = np.random.RandomState(42)
-    boot = np.array([np.array(preds) + rng.normal(0, std_r, len(preds))
-                      for _ in range(n_boot)])
-
-    lo = np.percentile(boot, 100 * alpha / 2, axis=0)
-    hi = np.percentile(boot, 100 * (1 - alpha / 2), axis=0)
-
-    return (
-        [round(float(v), 4) for v in lo],
-        [round(float(v), 4) for v in hi],
-    )
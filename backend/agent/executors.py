@@ -0,0 +1,166 @@
+"""
+进程池管理 — 统计模型拟合的共享工作进程与分析工具线程池
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+MAX_WORKERS = int(os.getenv("AGENT_MAX_WORKERS", "0")) or (os.cpu_count() or 1)
+TOOL_THREADS = int(os.getenv("AGENT_TOOL_THREADS", "0")) or max(4, MAX_WORKERS)
+
+_POLL = 0.05  # seconds between checks for queued calls that have started
+
+# Workers come from a fork server, never from forking this (threaded)
+# process; it preloads the modelling stack so workers start warm.
+_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+_PRELOAD = ["numpy", "statsmodels.tsa.arima.model", "statsmodels.tsa.holtwinters"]
+
+_pool = None
+_pool_lock = threading.Lock()
+_thread_pool = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the process-wide worker pool, creating it on first use.
+
+    The pool is reused across requests so worker start-up is paid once. It
+    always has ``MAX_WORKERS`` processes and is only replaced once broken,
+    so a live pool never has other requests' work cancelled under it.
+    Callers that want fewer processes use :func:`run_bounded`.
+
+    Workers are started by a fork server (``spawn`` where that is not
+    available): forking a gunicorn thread worker directly would copy locks
+    held by its other threads.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _is_broken(_pool):
+            _pool.shutdown(wait=False)
+            _pool = None
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=_mp_context())
+        return _pool
+
+
+def reset_process_pool(pool: ProcessPoolExecutor = None):
+    """Discard the shared pool after a worker crashed.
+
+    With ``pool`` given, only that pool is discarded, so a caller holding a
+    stale reference can't tear down a newer, healthy pool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None and (pool is None or pool is _pool):
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+def run_bounded(pool, calls: list, max_workers: int = None,
+                timeout: float = None, deadline: float = None) -> list:
+    """Run ``calls`` on ``pool`` with at most ``max_workers`` in flight.
+
+    ``calls`` is a list of ``(fn, args, kwargs)``. Returns their results in
+    order, ``None`` for a call that raised, timed out or never started.
+    Raises ``BrokenProcessPool`` if the pool can't accept work, so the
+    caller can fall back to running in-process.
+    Further calls are submitted only as earlier ones finish, so one caller
+    never occupies more than ``max_workers`` of the shared pool.
+
+    ``timeout`` bounds each call from the moment the pool dispatches it to
+    a worker, not from submission. ``deadline`` (``time.monotonic()``)
+    bounds the whole batch. A process can't be interrupted, so a call that
+    times out is abandoned: its result is dropped, but it keeps its worker
+    and counts against ``max_workers`` until it finishes, so it never eats
+    into the next call's timeout.
+    """
+    workers = max(1, min(max_workers or MAX_WORKERS, MAX_WORKERS))
+    results = [None] * len(calls)
+    queue = list(range(len(calls)))
+    in_flight, started = {}, {}
+    abandoned = set()  # timed out but still occupying a worker
+
+    while queue or in_flight:
+        now = time.monotonic()
+        if deadline is not None and now >= deadline:
+            break
+        abandoned = {fut for fut in abandoned if not fut.done()}
+        while queue and len(in_flight) + len(abandoned) < workers:
+            i = queue.pop(0)
+            fn, args, kwargs = calls[i]
+            try:
+                in_flight[pool.submit(fn, *args, **kwargs)] = i
+            except (BrokenProcessPool, RuntimeError, OSError):
+                reset_process_pool(pool)
+                for fut in in_flight:
+                    fut.cancel()
+                raise BrokenProcessPool("process pool is unavailable")
+
+        for fut in in_flight:
+            if fut not in started and fut.running():
+                started[fut] = now
+        limits = [deadline] if deadline is not None else []
+        if timeout is not None:
+            limits += [t + timeout for t in started.values()]
+        wait_for = min(limits) - now if limits else None
+        if timeout is not None and len(started) < len(in_flight):
+            # A call is still queued in the pool: poll until its clock starts
+            wait_for = _POLL if wait_for is None else min(wait_for, _POLL)
+        if wait_for is not None:
+            wait_for = max(0.0, wait_for)
+        # Abandoned calls free a slot for queued ones when they finish
+        watched = list(in_flight) + (list(abandoned) if queue else [])
+        done, _ = wait(watched, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+        now = time.monotonic()
+        for fut in list(in_flight):
+            if fut in done:
+                try:
+                    results[in_flight[fut]] = fut.result()
+                except BrokenProcessPool:
+                    reset_process_pool(pool)
+                except Exception:
+                    pass
+            elif timeout is not None and fut in started and now - started[fut] >= timeout:
+                if not fut.cancel():
+                    abandoned.add(fut)
+            else:
+                continue
+            del in_flight[fut]
+            started.pop(fut, None)
+
+    for fut in in_flight:
+        fut.cancel()
+    return results
+
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """Return the process-wide thread pool for analysis tools.
+
+    Tools are numpy/scipy bound and release the GIL in their hot loops, so
+    threads overlap them without pickling the series to another process.
+    """
+    global _thread_pool
+    with _pool_lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(max_workers=TOOL_THREADS,
+                                              thread_name_prefix="agent-tool")
+        return _thread_pool
+
+
+def _mp_context():
+    ctx = multiprocessing.get_context(_START_METHOD)
+    if _START_METHOD == "forkserver":
+        ctx.set_forkserver_preload(_PRELOAD)  # no-op once the server is up
+    return ctx
+
+
+def _is_broken(pool: ProcessPoolExecutor) -> bool:
+    return bool(getattr(pool, "_broken", False))
+
+
+__all__ = ["MAX_WORKERS", "TOOL_THREADS", "get_process_pool", "run_bounded",
+           "reset_process_pool", "get_thread_pool", "BrokenProcessPool"]
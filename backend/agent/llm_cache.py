@@ -0,0 +1,169 @@
+"""
+LLM 响应缓存 — 内存 LRU + TTL，可选 SQLite 持久化
+
+Only chains built as :class:`CachedLLMChain` consult it (the report and
+prediction chains); chat replies and memory summaries never do, so one
+session's conversation can't be served to another. Keys are the rendered
+prompt plus the model settings. A lookup tries the exact prompt
+first and then a normalized one, where every decimal literal is rewritten
+in its shortest round-trip form (``1.50`` and ``1.5e0`` become ``1.5``).
+Only formatting differs between prompts that share a normalized key: the
+values themselves keep full precision, so different data never collide.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import warnings
+
+from langchain.chains import LLMChain
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import LLMResult
+
+from .cache import LRUCache
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1").lower() in ("1", "true", "yes")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "512"))
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "")  # SQLite path; empty = memory only
+
+_DECIMAL = re.compile(r"-?\d+\.\d+(?:[eE][-+]?\d+)?")
+_cache_lock = threading.Lock()
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Rewrite every decimal literal in ``prompt`` as ``repr(float(literal))``."""
+    return _DECIMAL.sub(lambda m: repr(float(m.group())), prompt)
+
+
+class ResponseCache(BaseCache):
+    """LangChain ``BaseCache`` with exact and normalized-prompt lookup."""
+
+    def __init__(self, max_entries: int = LLM_CACHE_SIZE, ttl: float = LLM_CACHE_TTL,
+                 db_path: str = LLM_CACHE_DB):
+        self.ttl = ttl
+        self._memory = LRUCache(max_entries=max_entries,
+                                max_bytes=32 * 1024 * 1024, ttl=ttl)
+        self._db = _SQLiteStore(db_path, ttl) if db_path else None
+
+    def lookup(self, prompt: str, llm_string: str):
+        for key in self._keys(prompt, llm_string):
+            hit = self._memory.get(key)
+            if hit is None and self._db is not None:
+                hit = self._db.get(key)
+                if hit is not None:
+                    self._memory.put(key, hit, _nbytes(hit))
+            if hit is not None:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")  # loads() is flagged beta
+                    return [loads(g) for g in hit]
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        value = [dumps(g) for g in return_val]
+        for key in self._keys(prompt, llm_string):
+            self._memory.put(key, value, _nbytes(value))
+            if self._db is not None:
+                self._db.put(key, value)
+
+    def clear(self, **kwargs) -> None:
+        self._memory.clear()
+        if self._db is not None:
+            self._db.clear()
+
+    def stats(self) -> dict:
+        return self._memory.stats()
+
+    def _keys(self, prompt: str, llm_string: str) -> list:
+        exact = _digest("exact", llm_string, prompt)
+        norm = normalize_prompt(prompt)
+        return [exact] if norm == prompt else [exact, _digest("norm", llm_string, norm)]
+
+
+class _SQLiteStore:
+    """Write-through on-disk backing shared by every worker on the host."""
+
+    def __init__(self, path: str, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_response_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+
+    def get(self, key: str):
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, created FROM llm_response_cache WHERE key = ?",
+                    (key,)).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None or (self.ttl and time.time() - row[1] > self.ttl):
+            return None
+        return row[0].split("\x1e")
+
+    def put(self, key: str, value: list):
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_response_cache VALUES (?, ?, ?)",
+                    (key, "\x1e".join(value), time.time()))
+        except sqlite3.Error:
+            pass  # disk cache is best-effort
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_response_cache")
+
+
+class CachedLLMChain(LLMChain):
+    """``LLMChain`` whose LLM calls go through the shared :class:`ResponseCache`."""
+
+    def generate(self, input_list, run_manager=None) -> LLMResult:
+        cache = get_response_cache()
+        if cache is None:
+            return super().generate(input_list, run_manager=run_manager)
+        prompts, stop = self.prep_prompts(input_list, run_manager=run_manager)
+        llm_string = repr((sorted(self.llm.dict().items()), stop))
+        texts = [p.to_string() for p in prompts]
+        hits = [cache.lookup(text, llm_string) for text in texts]
+        if all(hit is not None for hit in hits):
+            return LLMResult(generations=hits)
+        result = super().generate(input_list, run_manager=run_manager)
+        for text, generations in zip(texts, result.generations):
+            cache.update(text, llm_string, generations)
+        return result
+
+
+_response_cache = None
+
+
+def get_response_cache():
+    """The process-wide :class:`ResponseCache`, or None when ``LLM_CACHE`` is off."""
+    global _response_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
+
+
+def _digest(*parts) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"|")
+    return h.hexdigest()
+
+
+def _nbytes(value: list) -> int:
+    return sum(len(v) for v in value) + 128
@@ -0,0 +1,78 @@
+"""
+LLM 客户端注册表 — 每个提供商一个长连接 HTTP 客户端与共享模型实例
+
+Building a ``ChatOpenAI`` creates a fresh OpenAI SDK client with its own
+connection pool, so doing it per request pays a TLS handshake each time.
+Models are memoized by their settings here, and every model for the same
+API base shares one keep-alive ``httpx.Client``.
+"""
+
+import os
+import threading
+
+import httpx
+import openai
+from langchain_openai import ChatOpenAI
+
+LLM_HTTP_TIMEOUT = float(os.getenv("LLM_HTTP_TIMEOUT", "600"))  # SDK default
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20"))
+LLM_HTTP_KEEPALIVE = float(os.getenv("LLM_HTTP_KEEPALIVE", "120"))
+
+_http_clients = {}
+_sdk_clients = {}
+_models = {}
+_lock = threading.Lock()
+
+
+def get_http_client(api_base: str) -> httpx.Client:
+    """Process-wide pooled HTTP client for one provider base URL."""
+    with _lock:
+        client = _http_clients.get(api_base)
+        if client is None:
+            client = httpx.Client(
+                timeout=LLM_HTTP_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=LLM_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_HTTP_MAX_CONNECTIONS,
+                    keepalive_expiry=LLM_HTTP_KEEPALIVE,
+                ),
+            )
+            _http_clients[api_base] = client
+        return client
+
+
+def get_chat_model(model_name: str, api_key: str, api_base: str,
+                   temperature: float) -> ChatOpenAI:
+    """Shared ``ChatOpenAI`` for these settings, on the provider's pooled client."""
+    key = (model_name, api_key, api_base, temperature)
+    with _lock:
+        model = _models.get(key)
+    if model is None:
+        sync_client, async_client = _sdk_completions(api_key, api_base)
+        model = ChatOpenAI(
+            model_name=model_name, openai_api_key=api_key,
+            openai_api_base=api_base, temperature=temperature,
+            client=sync_client, async_client=async_client,
+        )
+        with _lock:
+            model = _models.setdefault(key, model)
+    return model
+
+
+def _sdk_completions(api_key: str, api_base: str) -> tuple:
+    # Passed to ChatOpenAI as ready-made clients: its ``http_client`` field
+    # would also be handed to the async SDK client, which rejects a sync one.
+    key = (api_key, api_base)
+    with _lock:
+        pair = _sdk_clients.get(key)
+    if pair is None:
+        http_client = get_http_client(api_base)
+        pair = (
+            openai.OpenAI(api_key=api_key, base_url=api_base, timeout=LLM_HTTP_TIMEOUT,
+                          http_client=http_client).chat.completions,
+            openai.AsyncOpenAI(api_key=api_key, base_url=api_base,
+                               timeout=LLM_HTTP_TIMEOUT).chat.completions,
+        )
+        with _lock:
+            pair = _sdk_clients.setdefault(key, pair)
+    return pair
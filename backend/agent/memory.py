@@ -3,15 +3,16 @@
 """
 
 import time
-from typing import Optional
+from typing import Callable, Optional
 
 
 class ReasoningMemory:
     """Stores the full reasoning trajectory for a single prediction session."""
 
-    def __init__(self):
+    def __init__(self, on_step: Optional[Callable[[dict], None]] = None):
         self.steps = []
         self.start_time = time.time()
+        self.on_step = on_step  # called with each new step, e.g. to stream it
 
     def add_step(self, thought: str, action: str,
                  action_input: dict, observation: dict):
@@ -24,6 +25,11 @@ class ReasoningMemory:
             "observation": observation,
             "timestamp": round(time.time() - self.start_time, 2),
         })
+        if self.on_step is not None:
+            try:
+                self.on_step(self.steps[-1])
+            except Exception:
+                pass  # a broken listener must not abort the reasoning
 
     def get_summary(self) -> str:
         """Compact text summary for LLM context window."""
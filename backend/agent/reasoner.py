@@ -3,27 +3,43 @@
 Thought → Action → Observation 推理循环，支持动态工具选择与自适应分析。
 """
 
+import copy
 import os
 import json
+import queue
 import re
+import threading
+import time
+
 import numpy as np
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
 
+from .cache import RESULT_CACHE, approx_nbytes
 from .memory import ReasoningMemory
-from .ensemble import ensemble_predict
+from .ensemble import ENSEMBLE_INTERVAL, ensemble_predict
+from .executors import get_thread_pool
+from .llm_clients import get_chat_model
+from .scheduler import conditional_tools, run_dag, select_tools
 from .prompts.system import SYSTEM_PROMPT
 from .prompts.react import REACT_PROMPT
 from .prompts.critic import CRITIC_PROMPT
-from .tools import ALL_TOOLS
+from .tools import ALL_TOOLS, SeriesContext
 
 load_dotenv()
 
+# Concurrent tool scheduling returns the same trajectory as the sequential
+# run unless a tool misses its timeout, so it is on by default
+REASONER_CONCURRENT = os.getenv("AGENT_REASONER_CONCURRENT", "1").lower() in ("1", "true", "yes")
+
+# Grounding tools, always run; conditional tools hang off their results
+CORE_TOOLS = ["trend_analysis", "volatility_analysis",
+              "stationarity_test", "correlation_analysis"]
+
 
 def _init_llm():
-    """Initialize LLM from environment."""
+    """Shared LLM for the environment's provider (pooled client, built once)."""
     api_key = os.getenv("OPENAI_API_KEY", "")
     api_base = os.getenv("OPENAI_API_BASE", "")
     if "moonshot" in api_base:
@@ -34,39 +50,75 @@ def _init_llm():
         model = "glm-4-flash"
         if not api_base:
             api_base = "https://open.bigmodel.cn/api/paas/v4/"
-    return ChatOpenAI(
-        model_name=model, openai_api_key=api_key,
-        openai_api_base=api_base, temperature=0.3,
-    )
+    return get_chat_model(model, api_key, api_base, temperature=0.3)
 
 
 class TSReasoner:  # 保留类名以兼容导入
     """Core ReAct agent for time series analysis and forecasting."""
 
     def __init__(self, max_steps: int = 8, max_critic_rounds: int = 0,
-                 enable_correction: bool = False):
+                 enable_correction: bool = False, interval: str = None,
+                 concurrent: bool = None, tool_timeout: float = 10.0,
+                 budget: float = 30.0):
         self.llm = _init_llm()
         self.max_steps = max_steps
         self.max_critic_rounds = max_critic_rounds
         self.enable_correction = enable_correction
+        # "conformal" reuses cached CV residuals; default from AGENT_INTERVAL
+        self.interval = interval or ENSEMBLE_INTERVAL
+        # Concurrent mode: tools run on the shared thread pool as their
+        # dependencies resolve; each gets ``tool_timeout`` s, all analysis
+        # tools share ``budget`` s. Default from AGENT_REASONER_CONCURRENT.
+        self.concurrent = REASONER_CONCURRENT if concurrent is None else concurrent
+        self.tool_timeout = tool_timeout
+        self.budget = budget
         self.tools = ALL_TOOLS
 
-    def predict(self, data_y: list, steps: int = 10) -> dict:
-        """完整推理流程: 统计画像 → 推理分析 → 集成预测 → 修正。"""
-        memory = ReasoningMemory()
-        data = list(data_y)
-
-        # Phase 1: 统计画像
-        profile = self._ground(data, memory)
+    def predict(self, data_y: list, steps: int = 10, on_step=None) -> dict:
+        """完整推理流程: 统计画像 → 推理分析 → 集成预测 → 修正。
 
-        # Phase 2: 推理分析
-        self._reason(data, steps, profile, memory)
+        ``on_step(step)`` is called with each trajectory step as it is added.
+        """
+        data = list(data_y)
+        ctx = SeriesContext(data)  # shared by every tool in this request
+
+        # Repeat request (same data, horizon and config): replay the result
+        cache_key = ("reasoner", ctx.fingerprint, steps, self._config())
+        hit = RESULT_CACHE.get(cache_key)
+        if hit is not None:
+            result = copy.deepcopy(hit)
+            if on_step is not None:
+                for step in result["trajectory"]["steps"]:
+                    on_step(step)
+            return result
+
+        memory = ReasoningMemory(on_step=on_step)
+        deadline = time.monotonic() + self.budget if self.concurrent else None
+
+        # Phase 1+2: 统计画像 + 推理分析（依赖图调度）
+        # Horizon-independent, so it is reused when only ``steps`` changes.
+        analysis_key = ("reasoner-analysis", ctx.fingerprint, self._config(analysis=True))
+        analysis = RESULT_CACHE.get(analysis_key)
+        failed = set()
+        if analysis is not None:
+            profile = copy.deepcopy(analysis["profile"])
+            for s in analysis["steps"]:
+                memory.add_step(s["thought"], s["action"], s["action_input"],
+                                copy.deepcopy(s["observation"]))
+        else:
+            profile = self._analyze(ctx, memory, deadline, failed)
+            # A tool that raised or timed out leaves a degraded analysis:
+            # use it for this request, but don't serve it to later ones
+            if not failed:
+                analysis = copy.deepcopy({"profile": profile, "steps": memory.steps})
+                RESULT_CACHE.put(analysis_key, analysis, approx_nbytes(analysis))
 
         # Phase 3: 集成预测
-        ensemble_result = ensemble_predict(data, steps=steps)
+        ensemble_result = ensemble_predict(ctx, steps=steps, interval=self.interval)
         predictions = ensemble_result.get("predictions", [])
 
         if not predictions:
+            failed.add("ensemble_predict")
             predictions = self._fallback(data, steps)
 
         memory.add_step(
@@ -83,7 +135,7 @@ class TSReasoner:  # 保留类名以兼容导入
                 data, predictions, steps, cv_residuals, memory
             )
 
-        return {
+        result = {
             "engine": "思考模式",
             "predictions": predictions,
             "confidence": ensemble_result.get("weights", {}),
@@ -94,77 +146,101 @@ class TSReasoner:  # 保留类名以兼容导入
             "critic_log": correction_log,
             "steps": steps,
         }
+        if not failed:
+            RESULT_CACHE.put(cache_key, copy.deepcopy(result), approx_nbytes(result))
+        return result
+
+    def _config(self, analysis: bool = False) -> tuple:
+        """Engine settings that affect the result (``analysis``: phases 1-2 only)."""
+        config = (self.max_steps, self.concurrent, self.tool_timeout, self.budget)
+        if analysis:
+            return config
+        return config + (self.max_critic_rounds, self.enable_correction, self.interval)
+
+    def predict_stream(self, data_y: list, steps: int = 10):
+        """流式推理: yield ``(event, payload)`` as the reasoning progresses.
+
+        Events are ``("step", step)`` for every trajectory step the moment it
+        is recorded, then ``("result", result)`` with the full ``predict``
+        output, or ``("error", message)`` if it failed.
+        """
+        events = queue.Queue()
 
-    def _ground(self, data: list, memory: ReasoningMemory) -> dict:
-        """Phase 1: 统计画像 — 零成本特征提取。"""
-        profile = {}
-
-        # Always run these core tools
-        core_tools = ["trend_analysis", "volatility_analysis",
-                      "stationarity_test", "correlation_analysis"]
-
-        for name in core_tools:
-            tool = self.tools.get(name)
-            if tool:
-                try:
-                    result = tool["fn"](data)
-                    profile[name] = result
-                    memory.add_step(
-                        f"Grounding: run {name} for baseline profile.",
-                        name, {}, result,
-                    )
-                except Exception:
-                    pass
+        def run():
+            try:
+                result = self.predict(data_y, steps,
+                                      on_step=lambda s: events.put(("step", s)))
+                events.put(("result", result))
+            except Exception as e:
+                events.put(("error", str(e)))
+
+        threading.Thread(target=run, name="agent-reason-stream", daemon=True).start()
+        while True:
+            event = events.get()
+            yield event
+            if event[0] != "step":
+                return
+
+    def _analyze(self, data: SeriesContext, memory: ReasoningMemory,
+                 deadline: float = None, failed: set = None) -> dict:
+        """Phase 1+2: 统计画像 + 推理分析 — 按依赖图调度工具。
+
+        The core tools and the conditional tools they trigger run as one
+        dependency graph (see ``agent.scheduler``); in concurrent mode a
+        conditional tool starts as soon as its own trigger resolves.
+        Steps are recorded core tools first, then by tool priority, so the
+        trajectory does not depend on completion order. Tools that raised or
+        timed out are added to ``failed``.
+        """
+        # Fused FAP kernel: one sweep feeds the moments every tool reuses
+        profile = {"fap": data.profile}
+
+        pool = None
+        if self.concurrent:
+            pool = get_thread_pool()
+            # Prime the shared lazy features once instead of racing on them
+            _ = (data.fingerprint, data.profile)
+
+        # Record steps in a fixed order, each as soon as it and every tool
+        # before it have resolved, so streamed steps arrive progressively.
+        order = CORE_TOOLS + [t for t in conditional_tools(self.tools)
+                              if t not in CORE_TOOLS]
+        resolved = {}
+
+        def record(name):
+            result = resolved.get(name)
+            if result is None:
+                return
+            if name in CORE_TOOLS:
+                thought = f"Grounding: run {name} for baseline profile."
+            elif len(memory) < self.max_steps:
+                tool = self.tools[name]
+                thought = f"Profile suggests running {name}: {tool['description']}"
+            else:
+                return
+            profile[name] = result
+            memory.add_step(thought, name, {}, result)
+
+        def on_resolve(name, result):
+            resolved[name] = result
+            while order and order[0] in resolved:
+                record(order.pop(0))
+
+        results = run_dag(
+            self.tools, data, CORE_TOOLS, pool=pool,
+            max_tools=self.max_steps - len(memory),
+            tool_timeout=self.tool_timeout if self.concurrent else None,
+            deadline=deadline, on_resolve=on_resolve, failed=failed,
+        )
+        for name in order:  # tools after one that never resolved
+            resolved.setdefault(name, results.get(name))
+            record(name)
 
         return profile
 
-    def _reason(self, data: list, steps: int,
-                profile: dict, memory: ReasoningMemory):
-        """Phase 2: 推理循环 — 自适应工具选择。"""
-        # Decide which additional tools to run based on profile
-        extra_tools = self._select_tools(profile)
-
-        for tool_name in extra_tools:
-            if len(memory) >= self.max_steps:
-                break
-            tool = self.tools.get(tool_name)
-            if not tool:
-                continue
-            try:
-                result = tool["fn"](data)
-                thought = f"Profile suggests running {tool_name}: {tool['description']}"
-                memory.add_step(thought, tool_name, {}, result)
-                profile[tool_name] = result
-            except Exception:
-                pass
-
     def _select_tools(self, profile: dict) -> list:
-        """根据数据画像自适应选择分析工具。"""
-        selected = []
-
-        vol = profile.get("volatility_analysis", {})
-        corr = profile.get("correlation_analysis", {})
-        stat = profile.get("stationarity_test", {})
-
-        # High volatility → wavelet + anomaly
-        if vol.get("level") == "high":
-            selected.extend(["wavelet_decomposition", "anomaly_detection"])
-
-        # Strong periodicity → FFT + periodogram
-        if corr.get("has_seasonality"):
-            selected.extend(["fft_analysis", "seasonal_decompose"])
-
-        # Non-stationary → difference transform
-        if stat.get("verdict") in ("non_stationary", "difference_stationary"):
-            selected.append("difference_transform")
-
-        # Always useful
-        if "changepoint_detection" not in profile:
-            selected.append("changepoint_detection")
-
-        # Deduplicate and skip already-run tools
-        seen = set(profile.keys())
-        return [t for t in dict.fromkeys(selected) if t not in seen]
+        """根据数据画像自适应选择分析工具（由工具注册表的触发条件导出）。"""
+        return select_tools(self.tools, profile)
 
     def _residual_correction(self, data, predictions, steps,
                               cv_residuals, memory):
@@ -0,0 +1,173 @@
+"""
+工具调度器 — 按依赖关系 (DAG) 调度分析工具
+
+A registry entry may declare
+
+    ``requires``   names of tools whose results it depends on
+    ``condition``  ``fn(results) -> bool`` over those results; omitted = always
+    ``priority``   ordering among conditional tools (lower first)
+
+Entries with ``requires`` are *conditional tools*: they are scheduled the
+moment every required tool has finished and the condition holds, so a
+branch waiting on one grounding tool never waits for the others. Results
+are always reported in a fixed order, independent of completion timing.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+_SKIPPED = object()
+_POLL = 0.05  # seconds between checks for queued tools that have started
+
+
+def conditional_tools(tools: dict) -> list:
+    """Names of registry entries that declare ``requires``, by priority."""
+    names = [name for name, spec in tools.items() if "requires" in spec]
+    return sorted(names, key=lambda name: tools[name].get("priority", 100))
+
+
+def is_triggered(spec: dict, results: dict):
+    """True/False once every required result is known, else None.
+
+    A failed or skipped requirement resolves to False.
+    """
+    needed = spec.get("requires", [])
+    if any(req not in results for req in needed):
+        return None
+    if any(results[req] is _SKIPPED for req in needed):
+        return False
+    condition = spec.get("condition")
+    if condition is None:
+        return True
+    try:
+        return bool(condition(results))
+    except Exception:
+        return False
+
+
+def select_tools(tools: dict, profile: dict) -> list:
+    """Conditional tools triggered by an already-computed ``profile``."""
+    return [name for name in conditional_tools(tools)
+            if name not in profile and is_triggered(tools[name], profile)]
+
+
+def run_dag(tools: dict, data, roots: list, pool=None, max_tools: int = None,
+            tool_timeout: float = None, deadline: float = None,
+            on_resolve=None, failed: set = None) -> dict:
+    """Run ``roots`` plus every conditional tool they trigger.
+
+    Returns ``{name: result}`` for the tools that succeeded. With a ``pool``
+    (an executor) each tool is submitted as soon as it is triggered and
+    bounded by ``tool_timeout`` seconds, counted from when the pool starts
+    running it (not from submission), and the absolute ``deadline``.
+    Without one, tools run inline in root order and then by priority, and
+    conditional tools stop once ``max_tools`` tools have succeeded. Tools
+    that raise, time out or are not triggered are left out.
+
+    ``on_resolve(name, result)`` is called in the caller's thread as each
+    tool resolves, with ``result=None`` for a tool that was left out.
+    Tools that raised, timed out or were cut off by the deadline are added
+    to ``failed`` (when given), as opposed to tools that were not triggered.
+    """
+    roots = [name for name in roots if name in tools]
+    extras = [name for name in conditional_tools(tools) if name not in roots]
+    results = _Results(on_resolve)
+    failed = set() if failed is None else failed
+    if pool is None:
+        _run_inline(tools, data, roots, extras, max_tools, deadline, results, failed)
+        return results.succeeded()
+
+    futures, started = {}, {}
+
+    def submit(name):
+        futures[name] = pool.submit(tools[name]["fn"], data)
+
+    def schedule():
+        for name in extras:
+            if name in futures or name in results:
+                continue
+            triggered = is_triggered(tools[name], results)
+            if triggered and (deadline is None or time.monotonic() < deadline):
+                submit(name)
+            elif triggered is not None:
+                if triggered:
+                    failed.add(name)  # triggered, but past the deadline
+                results[name] = _SKIPPED
+
+    for name in roots:
+        submit(name)
+    schedule()
+
+    while futures:
+        now = time.monotonic()
+        for name, fut in futures.items():
+            if name not in started and fut.running():
+                started[name] = now
+        limits = [deadline] if deadline is not None else []
+        if tool_timeout is not None and started:
+            limits.append(min(started.values()) + tool_timeout)
+        timeout = max(0.0, min(limits) - now) if limits else None
+        if tool_timeout is not None and len(started) < len(futures):
+            # A tool is still queued in the pool: poll until its clock starts
+            timeout = _POLL if timeout is None else min(timeout, _POLL)
+        done, _ = wait(list(futures.values()), timeout=timeout,
+                       return_when=FIRST_COMPLETED)
+
+        now = time.monotonic()
+        for name, fut in list(futures.items()):
+            if fut in done:
+                try:
+                    results[name] = fut.result()
+                except Exception:
+                    failed.add(name)
+                    results[name] = _SKIPPED
+            elif ((tool_timeout is not None and name in started
+                   and now - started[name] >= tool_timeout)
+                  or (deadline is not None and now >= deadline)):
+                fut.cancel()
+                failed.add(name)
+                results[name] = _SKIPPED
+            else:
+                continue
+            del futures[name]
+            started.pop(name, None)
+        schedule()
+
+    return results.succeeded()
+
+
+class _Results(dict):
+    """Resolved tool results that notify ``on_resolve`` on every assignment."""
+
+    def __init__(self, on_resolve=None):
+        super().__init__()
+        self._on_resolve = on_resolve
+
+    def __setitem__(self, name, result):
+        super().__setitem__(name, result)
+        if self._on_resolve is not None:
+            self._on_resolve(name, None if result is _SKIPPED else result)
+
+    def succeeded(self) -> dict:
+        return {name: result for name, result in self.items()
+                if result is not _SKIPPED}
+
+
+def _run_inline(tools, data, roots, extras, max_tools, deadline, results, failed):
+    succeeded = 0
+    for name in roots + extras:
+        if deadline is not None and time.monotonic() >= deadline:
+            failed.update(n for n in roots + extras if n not in results)
+            break
+        if name in extras:
+            if max_tools is not None and succeeded >= max_tools:
+                break
+            if not is_triggered(tools[name], results):
+                results[name] = _SKIPPED
+                continue
+        try:
+            results[name] = tools[name]["fn"](data)
+            succeeded += 1
+        except Exception:
+            failed.add(name)
+            results[name] = _SKIPPED
@@ -1,4 +1,5 @@
 # 时序分析工具库
+from .context import SeriesContext, as_context
 from .statistical import STATISTICAL_TOOLS
 from .spectral import SPECTRAL_TOOLS
 from .decomposition import DECOMPOSITION_TOOLS
@@ -15,6 +16,8 @@ ALL_TOOLS = {
 
 __all__ = [
     "ALL_TOOLS",
+    "SeriesContext",
+    "as_context",
     "STATISTICAL_TOOLS",
     "SPECTRAL_TOOLS",
     "DECOMPOSITION_TOOLS",
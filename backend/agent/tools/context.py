@@ -0,0 +1,85 @@
+"""
+序列上下文 — 每个请求只计算一次的共享序列特征
+
+Tools accept either a raw list or a :class:`SeriesContext`; derived
+quantities are computed lazily on first access and then memoized, so the
+tools run on one request share a single pass for each of them.
+"""
+
+from functools import cached_property
+
+import numpy as np
+
+from ..cache import fingerprint
+from . import autocorr
+from .profiling import profile_series
+
+
+class SeriesContext:
+    """Immutable float series plus lazily memoized derived statistics."""
+
+    def __init__(self, data):
+        y = np.array(data, dtype=float)
+        y.flags.writeable = False  # shared between tools, never mutate
+        self.y = y
+
+    @property
+    def n(self) -> int:
+        return len(self.y)
+
+    @cached_property
+    def fingerprint(self) -> str:
+        return fingerprint(self.y)
+
+    @cached_property
+    def profile(self) -> dict:
+        """Fused FAP kernel output (moments, trend, shape, 3-sigma count)."""
+        return profile_series(self.y)
+
+    @property
+    def mean(self) -> float:
+        return self.profile["mean"]
+
+    @property
+    def std(self) -> float:
+        return self.profile["std"]
+
+    @property
+    def var(self) -> float:
+        return self.profile["var"]
+
+    @cached_property
+    def centered(self) -> np.ndarray:
+        return self.y - self.mean
+
+    @cached_property
+    def diff(self) -> np.ndarray:
+        return np.diff(self.y)
+
+    @property
+    def linfit(self) -> tuple:
+        """``(slope, intercept)`` of the least-squares line over ``arange(n)``."""
+        return self.profile["slope"], self.profile["intercept"]
+
+    @cached_property
+    def fft(self) -> np.ndarray:
+        """Real FFT of the mean-removed series."""
+        return np.fft.rfft(self.centered)
+
+    def acf(self, nlags: int = None) -> np.ndarray:
+        """Autocorrelation up to ``nlags`` from the shared FFT ACF service."""
+        return autocorr.acf(self.y, nlags, key=self.fingerprint)
+
+    def pacf(self, nlags: int) -> np.ndarray:
+        return autocorr.pacf(self.y, nlags, key=self.fingerprint)
+
+    def tolist(self) -> list:
+        return self.y.tolist()
+
+    def __len__(self):
+        return self.n
+
+
+def as_context(data) -> SeriesContext:
+    """Wrap ``data`` in a :class:`SeriesContext` unless it already is one."""
+    return data if isinstance(data, SeriesContext) else SeriesContext(data)
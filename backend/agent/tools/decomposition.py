@@ -2,46 +2,99 @@
 时序分解工具
 """
 
+import os
+
 import numpy as np
 
+from .autocorr import acf
+from .context import as_context
+from .unitroot import adf_test, ndiffs
+
+# Robust STL/MSTL costs seconds per few thousand points; above this many
+# points x periods the classical decomposition is used instead
+STL_MAX_POINTS = int(os.getenv("AGENT_STL_MAX_POINTS", "5000"))
+
 
-def seasonal_decompose(data: list, period: int = 0) -> dict:
-    """Additive seasonal decomposition (trend + seasonal + residual)."""
-    y = np.array(data, dtype=float)
+def seasonal_decompose(data: list, period: int = 0, method: str = "classical",
+                       periods: list = None) -> dict:
+    """Additive seasonal decomposition (trend + seasonal + residual).
+
+    ``method="classical"`` uses a centered moving average (one convolution)
+    and per-phase seasonal means (one bincount). ``method="stl"`` runs a
+    robust STL fit, or MSTL when several ``periods`` are given, as long as
+    ``n * len(periods)`` stays within ``STL_MAX_POINTS``; longer series fall
+    back to the classical method.
+    """
+    y = as_context(data).y
     n = len(y)
 
     # Auto-detect period if not given
     if period <= 0:
-        period = _estimate_period(y)
+        period = periods[0] if periods else _estimate_period(y)
     if period < 2 or period > n // 2:
         period = min(7, n // 3)
 
-    # Trend: centered moving average
-    trend = np.full(n, np.nan)
-    half = period // 2
-    for i in range(half, n - half):
-        trend[i] = np.mean(y[i - half:i + half + 1])
-
-    # Fill edges
-    valid = ~np.isnan(trend)
-    if valid.any():
-        first_valid = np.where(valid)[0][0]
-        last_valid = np.where(valid)[0][-1]
-        trend[:first_valid] = trend[first_valid]
-        trend[last_valid + 1:] = trend[last_valid]
-
-    # Seasonal component
-    detrended = y - trend
-    seasonal = np.zeros(n)
-    for i in range(period):
-        indices = list(range(i, n, period))
-        seasonal_mean = np.nanmean(detrended[indices])
-        for idx in indices:
-            seasonal[idx] = seasonal_mean
-
-    # Residual
+    stl_periods = [p for p in (periods or [period]) if 2 <= p <= n // 2] or [period]
+    if method == "stl" and period >= 2 and n * len(stl_periods) <= STL_MAX_POINTS:
+        try:
+            trend, seasonal, residual = _stl_components(y, stl_periods)
+            result = _decompose_result(y, period, trend, seasonal, residual)
+            result["method"] = "mstl" if len(stl_periods) > 1 else "stl"
+            if len(stl_periods) > 1:
+                result["periods"] = stl_periods
+            return result
+        except Exception:
+            pass  # fall back to the classical decomposition
+
+    trend = _moving_average_trend(y, period)
+    seasonal = _seasonal_profile(y - trend, period)
     residual = y - trend - seasonal
+    return _decompose_result(y, period, trend, seasonal, residual)
+
 
+def _moving_average_trend(y: np.ndarray, period: int) -> np.ndarray:
+    """Centered moving average over ``2 * (period // 2) + 1`` points, edges held flat."""
+    n = len(y)
+    half = period // 2
+    width = 2 * half + 1
+    if n < width:
+        return np.full(n, np.nan)
+    trend = np.empty(n)
+    trend[half:n - half] = np.convolve(y, np.full(width, 1.0 / width), mode="valid")
+    trend[:half] = trend[half]
+    trend[n - half:] = trend[n - half - 1]
+    return trend
+
+
+def _seasonal_profile(detrended: np.ndarray, period: int) -> np.ndarray:
+    """Per-phase (index mod ``period``) NaN-aware mean, broadcast back to length n."""
+    n = len(detrended)
+    if period <= 0:
+        return np.zeros(n)
+    phase = np.arange(n) % period
+    valid = ~np.isnan(detrended)
+    sums = np.bincount(phase, weights=np.where(valid, detrended, 0.0), minlength=period)
+    counts = np.bincount(phase, weights=valid.astype(float), minlength=period)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+    return means[phase]
+
+
+def _stl_components(y: np.ndarray, periods: list) -> tuple:
+    """Robust STL (one period) or MSTL (several); returns trend, seasonal, residual."""
+    from statsmodels.tsa.seasonal import STL, MSTL
+
+    if len(periods) > 1:
+        res = MSTL(y, periods=sorted(periods), stl_kwargs={"robust": True}).fit()
+        seasonal = np.asarray(res.seasonal, dtype=float)
+        seasonal = seasonal.sum(axis=1) if seasonal.ndim > 1 else seasonal
+    else:
+        res = STL(y, period=periods[0], robust=True).fit()
+        seasonal = np.asarray(res.seasonal, dtype=float)
+    return np.asarray(res.trend, dtype=float), seasonal, np.asarray(res.resid, dtype=float)
+
+
+def _decompose_result(y, period, trend, seasonal, residual) -> dict:
     return {
         "tool": "seasonal_decompose",
         "period": period,
@@ -57,13 +110,11 @@ def seasonal_decompose(data: list, period: int = 0) -> dict:
 
 
 def _estimate_period(y: np.ndarray) -> int:
-    """Auto-estimate dominant period via ACF peaks."""
+    """Auto-estimate dominant period via ACF peaks (FFT ACF, O(n log n))."""
     n = len(y)
     if n < 8:
         return 2
-    y_c = y - np.mean(y)
-    corr = np.correlate(y_c, y_c, mode="full")[n - 1:]
-    corr = corr / (corr[0] + 1e-10)
+    corr = acf(y)
 
     # Find first peak after lag 1
     for i in range(2, len(corr) - 1):
@@ -72,36 +123,57 @@ def _estimate_period(y: np.ndarray) -> int:
     return min(7, n // 3)
 
 
-def difference_transform(data: list, order: int = 1) -> dict:
-    """Differencing transform for non-stationary series."""
-    y = np.array(data, dtype=float)
+def difference_transform(data: list, order: int = 1, unit_root: bool = False) -> dict:
+    """Differencing transform for non-stationary series.
 
-    diffed = y.copy()
-    for _ in range(order):
+    With ``unit_root=True`` the result also carries the differenced
+    series' ADF p-value and the ``ndiffs`` suggested order; the original
+    series' ADF comes from the unit-root cache shared with
+    ``stationarity_test``, but the differenced series needs its own test.
+    """
+    ctx = as_context(data)
+    y = ctx.y
+
+    diffed = ctx.diff if order >= 1 else y
+    for _ in range(order - 1):
         diffed = np.diff(diffed)
 
-    return {
+    result = {
         "tool": "difference_transform",
         "order": order,
-        "original_mean": round(float(np.mean(y)), 4),
+        "original_mean": round(ctx.mean, 4),
         "differenced_mean": round(float(np.mean(diffed)), 4),
         "differenced_std": round(float(np.std(diffed)), 4),
         "variance_reduction": round(float(
-            1 - np.var(diffed) / (np.var(y) + 1e-10)
+            1 - np.var(diffed) / (ctx.var + 1e-10)
         ), 4),
     }
+    if unit_root:
+        try:
+            diffed_p = round(adf_test(diffed)["p_value"], 4)
+        except (ValueError, np.linalg.LinAlgError):
+            diffed_p = None
+        result["differenced_adf_p_value"] = diffed_p
+        result["suggested_order"] = ndiffs(y, key=ctx.fingerprint)
+    return result
 
 
 # --- Tool Registry ---
 DECOMPOSITION_TOOLS = {
     "seasonal_decompose": {
         "fn": seasonal_decompose,
-        "description": "Additive seasonal decomposition into trend, seasonal, residual. Use to understand data structure.",
+        "description": "Additive seasonal decomposition (classical or robust STL/MSTL) into trend, seasonal, residual. Use to understand data structure.",
         "triggers": ["decompose", "seasonal", "trend_seasonal"],
+        "requires": ["correlation_analysis"],
+        "condition": lambda p: bool(p["correlation_analysis"].get("has_seasonality")),
+        "priority": 21,
     },
     "difference_transform": {
         "fn": difference_transform,
         "description": "Differencing transform for non-stationary series. Use when stationarity test fails.",
         "triggers": ["difference", "non_stationary", "integrate"],
+        "requires": ["stationarity_test"],
+        "condition": lambda p: p["stationarity_test"].get("verdict") in ("non_stationary", "difference_stationary"),
+        "priority": 30,
     },
 }
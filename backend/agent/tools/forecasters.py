@@ -3,37 +3,161 @@
 Each forecaster returns predictions + metadata for ensemble weighting.
 """
 
+import multiprocessing
+import os
+import threading
+import warnings
+from contextlib import contextmanager
+
 import numpy as np
+from scipy.signal import lfilter
 from statsmodels.tsa.holtwinters import ExponentialSmoothing
 from statsmodels.tsa.arima.model import ARIMA
 
+from ..cache import LRUCache, fingerprint
+from ..executors import MAX_WORKERS, get_process_pool, run_bounded, BrokenProcessPool
+from .context import as_context
+from .unitroot import ndiffs
+
+# Candidate (p, d, q) orders, searched in this order; ties keep the first.
+ARIMA_ORDERS = [(p, d, q) for p in [1, 2, 3, 5] for d in [0, 1] for q in [0, 1]]
+# Wider grid searched when screening is on; only the screened orders are fitted
+ARIMA_SCREEN_ORDERS = [(p, d, q) for p in range(6) for d in [0, 1] for q in [0, 1]]
+
+# Defaults for arima_forecast's search modes. The parallel search picks the
+# same order as the sequential one, so it is on wherever there is more than
+# one CPU. Screening fits ``ARIMA_SCREEN_TOP_K`` orders per ``d`` out of the
+# wider grid (0 fits all of ``ARIMA_ORDERS``); up-front differencing can
+# change the chosen order and stays opt-in.
+ARIMA_PARALLEL = os.getenv("AGENT_ARIMA_PARALLEL", "1" if MAX_WORKERS > 1 else "0"
+                           ).lower() in ("1", "true", "yes")
+ARIMA_SCREEN_TOP_K = int(os.getenv("AGENT_ARIMA_SCREEN_TOP_K", "3"))
+ARIMA_SELECT_D = os.getenv("AGENT_ARIMA_SELECT_D", "0").lower() in ("1", "true", "yes")
+
+# Fitted-model cache shared by every caller in the process (ensemble, its CV
+# step, the upload pipeline). Keys are content hashes of the exact series
+# that was fitted — a training slice hashes differently from the full
+# series — plus the model order/config.
+MODEL_CACHE = LRUCache(max_entries=1024, max_bytes=32 * 1024 * 1024)
+_FIT_FAILED = object()
+_MISSING = object()
+_cache_mode = threading.local()
+
+
+class CacheMiss(Exception):
+    """Raised inside :func:`cached_only` when a fit is not in ``MODEL_CACHE``."""
+
+
+@contextmanager
+def cached_only():
+    """Within this block forecasters only serve fits from ``MODEL_CACHE``.
+
+    A fit that would have to be computed raises :class:`CacheMiss` instead,
+    so a caller can tell cheap, fully cached forecasts from ones worth
+    sending to a worker process.
+    """
+    previous = getattr(_cache_mode, "only", False)
+    _cache_mode.only = True
+    try:
+        yield
+    finally:
+        _cache_mode.only = previous
+
+
+def run_with_fits(fn, data, steps: int):
+    """Run forecaster ``fn`` and return ``(result, fits)`` for pool workers.
+
+    ``fits`` are the worker's ``MODEL_CACHE`` entries for this series
+    (keys carry the series fingerprint); pass them to :func:`merge_fits`
+    in the parent process.
+    """
+    ctx = as_context(data)
+    result = fn(ctx, steps=steps)
+    fits = [(k, None if v is _FIT_FAILED else v) for k, v in MODEL_CACHE.items()
+            if k[1] == ctx.fingerprint]
+    return result, fits
+
+
+def merge_fits(fits):
+    """Store fits computed in another process (see :func:`run_with_fits`)."""
+    for key, value in fits:
+        if value is None:
+            MODEL_CACHE.put(key, _FIT_FAILED, 64)
+        elif isinstance(value, tuple):
+            _store_fit(key, value)
+        else:
+            MODEL_CACHE.put(key, value, value.nbytes + 128)
+
+
+def _check_miss():
+    if getattr(_cache_mode, "only", False):
+        raise CacheMiss()
+
+
+def arima_forecast(data: list, steps: int = 10, parallel: bool = None,
+                   max_workers: int = None, fit_timeout: float = 30.0,
+                   screen_top_k: int = None, orders: list = None,
+                   select_d: bool = None) -> dict:
+    """ARIMA forecaster with automatic order selection.
 
-def arima_forecast(data: list, steps: int = 10) -> dict:
-    """ARIMA forecaster with automatic order selection."""
-    y = np.array(data, dtype=float)
+    ``parallel``, ``screen_top_k`` and ``select_d`` default to
+    ``ARIMA_PARALLEL``, ``ARIMA_SCREEN_TOP_K`` and ``ARIMA_SELECT_D``.
+    Inside a pool worker the search always runs sequentially.
+
+    With ``parallel=True`` the candidate fits are spread over the shared
+    process pool (at most ``max_workers`` processes at a time). A fit that
+    runs longer than ``fit_timeout`` seconds, counted from when it starts,
+    is dropped; its worker stays busy until the fit ends. Both paths pick
+    the same best-AIC order.
+
+    With ``screen_top_k > 0`` the default grid is ``ARIMA_SCREEN_ORDERS``;
+    every candidate is first scored by an approximate AIC (see
+    :func:`screen_orders`) and only the top-k orders for each ``d`` get a
+    full MLE fit.
+
+    With ``select_d=True`` the differencing order is fixed up front by
+    repeated ADF tests (cached per series, shared with ``stationarity_test``)
+    and only candidates with that ``d`` are fitted.
+    """
+    if parallel is None:
+        parallel = ARIMA_PARALLEL and multiprocessing.parent_process() is None
+    if screen_top_k is None:
+        screen_top_k = ARIMA_SCREEN_TOP_K
+    if select_d is None:
+        select_d = ARIMA_SELECT_D
+
+    ctx = as_context(data)
+    y = ctx.y
+    series_key = ctx.fingerprint
+    orders = list(orders or (ARIMA_SCREEN_ORDERS if screen_top_k > 0 else ARIMA_ORDERS))
+
+    if select_d:
+        d = ndiffs(y, max_d=max(o[1] for o in orders), key=series_key)
+        orders = [o for o in orders if o[1] == d] or orders
+
+    if screen_top_k > 0 and len(orders) > screen_top_k:
+        orders = screen_orders(y, orders, screen_top_k)
 
     # Try common orders, pick best AIC
-    best_aic, best_order, best_model = np.inf, (1, 1, 0), None
-    for p in [1, 2, 3, 5]:
-        for d in [0, 1]:
-            for q in [0, 1]:
-                try:
-                    m = ARIMA(y, order=(p, d, q)).fit()
-                    if m.aic < best_aic:
-                        best_aic, best_order, best_model = m.aic, (p, d, q), m
-                except Exception:
-                    continue
+    if parallel:
+        fits = _fit_orders_parallel(y, orders, steps, max_workers, fit_timeout,
+                                    series_key)
+    else:
+        fits = [fit_arima(y, order, steps, series_key) for order in orders]
 
-    if best_model is None:
+    best_aic, best_order, best_fc = np.inf, (1, 1, 0), None
+    for order, fit in zip(orders, fits):
+        if fit is not None and fit[0] < best_aic:
+            best_aic, best_order, best_fc = fit[0], order, fit[1]
+
+    if best_fc is None:
         # Fallback: simple ARIMA(1,1,0)
-        try:
-            best_model = ARIMA(y, order=(1, 1, 0)).fit()
-            best_order = (1, 1, 0)
-        except Exception:
+        fit = fit_arima(y, (1, 1, 0), steps, series_key)
+        if fit is None:
             return _fallback_forecast(y, steps, "arima")
+        best_aic, best_order, best_fc = fit[0], (1, 1, 0), fit[1]
 
-    fc = best_model.forecast(steps=steps)
-    preds = [round(float(v), 4) for v in fc]
+    preds = [round(float(v), 4) for v in best_fc]
 
     return {
         "tool": "arima_forecast",
@@ -43,9 +167,196 @@ def arima_forecast(data: list, steps: int = 10) -> dict:
     }
 
 
+def screen_orders(y, orders, top_k=3):
+    """Keep the ``top_k`` orders per differencing order by approximate AIC.
+
+    Each order's coefficients are estimated by Hannan-Rissanen regressions
+    on the differenced series, then scored with an exact Gaussian
+    log-likelihood pass on ``y`` itself, so the scores sit on the scale of
+    the MLE AIC. Ranking is still done within each ``d``: the estimates are
+    rougher for some ``d`` than others, and a cut across ``d`` would drop
+    whole families. The returned orders keep their original relative order
+    so AIC ties resolve as in the full search. Orders that cannot be
+    screened are kept.
+    """
+    y = np.asarray(y, dtype=float)
+    keep = set()
+    for d in sorted({o[1] for o in orders}):
+        group = [o for o in orders if o[1] == d]
+        scores = _approx_aic(y, group, d)
+        ranked = sorted(scores, key=scores.get)
+        keep.update(ranked[:top_k])
+        keep.update(o for o in group if o not in scores)
+    return [o for o in orders if o in keep]
+
+
+def _approx_aic(y, orders, d):
+    """Approximate AIC for each (p, d, q) in ``orders``; unscorable ones are left out.
+
+    The likelihood is evaluated at the Hannan-Rissanen estimates and at
+    statsmodels' own starting values, and the better of the two is kept.
+    """
+    z = np.diff(y, n=d) if d else y
+    scores = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # start_params warns on rough starts
+        for order in orders:
+            model = ARIMA(y, order=order)
+            candidates = [_hannan_rissanen(z, order[0], order[2], d == 0)]
+            try:
+                candidates.append(np.asarray(model.start_params, dtype=float))
+            except Exception:
+                pass
+            for params in candidates:
+                if params is None:
+                    continue
+                try:
+                    llf = model.loglike(params)
+                except Exception:
+                    continue
+                if np.isfinite(llf):
+                    aic = -2 * llf + 2 * len(params)
+                    scores[order] = min(aic, scores.get(order, np.inf))
+    return scores
+
+
+def _hannan_rissanen(z, p, q, const, iterations=3):
+    """ARMA(p, q) estimates on ``z`` as ARIMA params ``[mean], ar, ma, sigma2``.
+
+    A long AR fitted by least squares gives the first innovation estimates.
+    Each pass then regresses ``z_t`` on its lags and the lagged innovations,
+    and refilters the innovations through the fitted ARMA. Returns None if
+    the series is too short.
+    """
+    n = len(z)
+    long_ar = max(p + q, min(int(10 * np.log10(max(n, 10))), n // 4))
+    start = long_ar + max(p, q)
+    if n - start < p + q + 10:
+        return None
+
+    lags = np.column_stack([z[long_ar - i:n - i] for i in range(1, long_ar + 1)])
+    X = np.column_stack([np.ones(len(lags)), lags])
+    beta, *_ = np.linalg.lstsq(X, z[long_ar:], rcond=None)
+    e = np.zeros(n)
+    e[long_ar:] = z[long_ar:] - X @ beta
+
+    target = z[start:]
+    for step in range(iterations + 1 if q else 1):
+        cols = [z[start - i:n - i] for i in range(1, p + 1)]
+        cols += [e[start - i:n - i] for i in range(1, q + 1)]
+        if const:
+            cols = [np.ones(len(target))] + cols
+        if cols:
+            X = np.column_stack(cols)
+            beta, *_ = np.linalg.lstsq(X, target, rcond=None)
+            resid = target - X @ beta
+        else:
+            beta, resid = np.zeros(0), target
+        c, ar, ma = (beta[0], beta[1:p + 1], beta[p + 1:]) if const else (0.0, beta[:p], beta[p:])
+        if q and step < iterations:
+            e = lfilter([1.0], np.r_[1.0, _shrink_roots(ma, -1)],
+                        lfilter(np.r_[1.0, -ar], [1.0], z) - c)
+            e[:max(p, 1)] = 0.0
+
+    sigma2 = float(np.mean(resid ** 2))
+    if not np.isfinite(sigma2) or sigma2 <= 0:
+        return None
+    ar, ma = _shrink_roots(ar, 1), _shrink_roots(ma, -1)
+    if const:
+        mean = c / (1 - ar.sum()) if abs(1 - ar.sum()) > 1e-6 else float(np.mean(z))
+        return np.r_[mean, ar, ma, sigma2]
+    return np.r_[ar, ma, sigma2]
+
+
+def _shrink_roots(coefs, sign):
+    """Scale lag coefficients so ``1 - sign * sum(c_i L^i)`` has roots outside the unit circle."""
+    coefs = np.asarray(coefs, dtype=float)
+    if not len(coefs):
+        return coefs
+    smallest = np.min(np.abs(np.roots(np.r_[1.0, -sign * coefs][::-1])))
+    if smallest > 1.01:
+        return coefs
+    return coefs * (smallest / 1.01) ** np.arange(1, len(coefs) + 1)
+
+
+def fit_arima(y, order, steps: int = 10, series_key: str = None):
+    """Cached ARIMA fit: ``(aic, forecast)`` for ``order`` on ``y``, or None.
+
+    Forecasts are stored at the longest horizon requested so far; shorter
+    horizons are served as a prefix of it.
+    """
+    y = np.asarray(y, dtype=float)
+    key = ("arima", series_key or fingerprint(y), tuple(order))
+    fit = _cached_fit(key, steps)
+    if fit is _MISSING:
+        _check_miss()
+        fit = _fit_order(y, order, steps)
+        _store_fit(key, fit)
+    return fit
+
+
+def _cached_fit(key, steps):
+    hit = MODEL_CACHE.get(key, _MISSING)
+    if hit is _MISSING:
+        return _MISSING
+    if hit is _FIT_FAILED:
+        return None
+    aic, fc = hit
+    return (aic, fc[:steps]) if len(fc) >= steps else _MISSING
+
+
+def _store_fit(key, fit):
+    if fit is None:
+        MODEL_CACHE.put(key, _FIT_FAILED, 64)
+    else:
+        MODEL_CACHE.put(key, fit, fit[1].nbytes + 128)
+
+
+def _fit_order(y, order, steps):
+    """Fit one ARIMA order; return ``(aic, forecast)`` or None on failure.
+
+    Module-level so it can run inside pool workers; only the AIC and the
+    forecast travel back, not the (large) results object.
+    """
+    try:
+        m = ARIMA(y, order=order).fit()
+        return float(m.aic), np.asarray(m.forecast(steps=steps), dtype=float)
+    except Exception:
+        return None
+
+
+def _fit_orders_parallel(y, orders, steps, max_workers, fit_timeout, series_key):
+    """Fit ``orders`` on the process pool; results keep the order of ``orders``.
+
+    Cached fits are served in-process; only misses are sent to workers.
+    """
+    keys = [("arima", series_key, tuple(order)) for order in orders]
+    fits = [_cached_fit(key, steps) for key in keys]
+    pending = [i for i, fit in enumerate(fits) if fit is _MISSING]
+    if not pending:
+        return fits
+    _check_miss()
+
+    calls = [(_fit_order, (y, orders[i], steps), {}) for i in pending]
+    try:
+        outcomes = run_bounded(get_process_pool(), calls, max_workers=max_workers,
+                               timeout=fit_timeout)
+    except (BrokenProcessPool, RuntimeError, OSError):
+        for i in pending:
+            fits[i] = fit_arima(y, orders[i], steps, series_key)
+        return fits
+
+    for i, fit in zip(pending, outcomes):
+        fits[i] = fit
+        if fit is not None:
+            _store_fit(keys[i], fit)
+    return fits
+
+
 def ets_forecast(data: list, steps: int = 10) -> dict:
     """Exponential Smoothing (ETS) forecaster."""
-    y = np.array(data, dtype=float)
+    ctx = as_context(data)
+    y = ctx.y
     n = len(y)
 
     # Choose config based on data length
@@ -55,15 +366,23 @@ def ets_forecast(data: list, steps: int = 10) -> dict:
         sp = min(7, n // 3)
         seasonal = "add"
 
-    try:
-        model = ExponentialSmoothing(
-            y, trend="add", seasonal=seasonal,
-            seasonal_periods=sp if seasonal else None,
-        ).fit(optimized=True)
-        fc = model.forecast(steps)
-        preds = [round(float(v), 4) for v in fc]
-    except Exception:
+    key = ("ets", ctx.fingerprint, "add", seasonal, sp)
+    fc = MODEL_CACHE.get(key, _MISSING)
+    if fc is _MISSING or (fc is not _FIT_FAILED and len(fc) < steps):
+        _check_miss()
+        try:
+            model = ExponentialSmoothing(
+                y, trend="add", seasonal=seasonal,
+                seasonal_periods=sp if seasonal else None,
+            ).fit(optimized=True)
+            fc = np.asarray(model.forecast(steps), dtype=float)
+            MODEL_CACHE.put(key, fc, fc.nbytes + 128)
+        except Exception:
+            MODEL_CACHE.put(key, _FIT_FAILED, 64)
+            fc = _FIT_FAILED
+    if fc is _FIT_FAILED:
         return _fallback_forecast(y, steps, "ets")
+    preds = [round(float(v), 4) for v in fc[:steps]]
 
     return {
         "tool": "ets_forecast",
@@ -74,8 +393,8 @@ def ets_forecast(data: list, steps: int = 10) -> dict:
 
 def theta_forecast(data: list, steps: int = 10) -> dict:
     """Theta method forecaster (simplified)."""
-    y = np.array(data, dtype=float)
-    n = len(y)
+    ctx = as_context(data)
+    y = ctx.y
 
     # SES for level
     alpha = 0.5
@@ -84,8 +403,7 @@ def theta_forecast(data: list, steps: int = 10) -> dict:
         level = alpha * v + (1 - alpha) * level
 
     # Linear trend
-    x = np.arange(n)
-    slope = float(np.polyfit(x, y, 1)[0])
+    slope = ctx.linfit[0]
 
     preds = []
     for i in range(1, steps + 1):
@@ -100,19 +418,17 @@ def theta_forecast(data: list, steps: int = 10) -> dict:
 
 def linear_forecast(data: list, steps: int = 10) -> dict:
     """Linear regression forecaster with value clipping."""
-    y = np.array(data, dtype=float)
-    n = len(y)
-    x = np.arange(n)
+    ctx = as_context(data)
+    n = ctx.n
 
     # Pure linear regression (no quadratic — it extrapolates wildly)
-    coeffs = np.polyfit(x, y, 1)
-    poly = np.poly1d(coeffs)
+    poly = np.poly1d(ctx.linfit)
     future_x = np.arange(n, n + steps)
     raw = poly(future_x)
 
     # Clip to [mean - 4*std, mean + 4*std] to prevent runaway extrapolation
-    mean_val = float(np.mean(y))
-    std_val = float(np.std(y)) if float(np.std(y)) > 1e-10 else 1.0
+    mean_val = ctx.mean
+    std_val = ctx.std if ctx.std > 1e-10 else 1.0
     lo = mean_val - 4 * std_val
     hi = mean_val + 4 * std_val
     clipped = np.clip(raw, lo, hi)
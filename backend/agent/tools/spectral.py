@@ -5,17 +5,16 @@
 import numpy as np
 from scipy import signal
 
+from .context import as_context
+
 
 def fft_analysis(data: list) -> dict:
     """FFT spectrum analysis — extract dominant frequencies."""
-    y = np.array(data, dtype=float)
-    n = len(y)
-
-    # Remove mean (DC component)
-    y_centered = y - np.mean(y)
+    ctx = as_context(data)
+    n = ctx.n
 
-    # FFT
-    fft_vals = np.fft.rfft(y_centered)
+    # FFT of the mean-removed series (DC component removed)
+    fft_vals = ctx.fft
     magnitudes = np.abs(fft_vals)
     freqs = np.fft.rfftfreq(n)
 
@@ -54,7 +53,7 @@ def fft_analysis(data: list) -> dict:
 
 def wavelet_decomposition(data: list, max_level: int = 4) -> dict:
     """DWT multi-scale decomposition using Haar wavelet (no PyWavelets dependency)."""
-    y = np.array(data, dtype=float)
+    y = as_context(data).y
     n = len(y)
 
     # Simple Haar wavelet decomposition
@@ -93,7 +92,7 @@ def wavelet_decomposition(data: list, max_level: int = 4) -> dict:
 
 def periodogram(data: list) -> dict:
     """Welch periodogram for robust spectral density estimation."""
-    y = np.array(data, dtype=float)
+    y = as_context(data).y
     n = len(y)
     nperseg = min(256, n // 2) if n > 8 else n
 
@@ -131,11 +130,17 @@ SPECTRAL_TOOLS = {
         "fn": fft_analysis,
         "description": "FFT spectrum analysis to extract dominant frequencies and periodicity. Use for periodic or seasonal data.",
         "triggers": ["frequency", "fft", "periodic", "cycle"],
+        "requires": ["correlation_analysis"],
+        "condition": lambda p: bool(p["correlation_analysis"].get("has_seasonality")),
+        "priority": 20,
     },
     "wavelet_decomposition": {
         "fn": wavelet_decomposition,
         "description": "Haar wavelet multi-scale decomposition. Use for multi-resolution analysis of complex signals.",
         "triggers": ["wavelet", "multiscale", "resolution"],
+        "requires": ["volatility_analysis"],
+        "condition": lambda p: p["volatility_analysis"].get("level") == "high",
+        "priority": 10,
     },
     "periodogram": {
         "fn": periodogram,
@@ -5,33 +5,26 @@ Each function is an Agent-callable tool that returns structured results
 for LLM reasoning without requiring token-expensive raw data processing.
 """
 
+from collections import deque
+
 import numpy as np
 from scipy import stats
-from sklearn.ensemble import IsolationForest
-from sklearn.neighbors import LocalOutlierFactor
-from statsmodels.tsa.stattools import adfuller, kpss, acf, pacf
+from statsmodels.tsa.stattools import kpss
+
+from .context import as_context
+from .unitroot import UNITROOT_CACHE, adf_test
 
 
 def trend_analysis(data: list) -> dict:
     """Mann-Kendall trend test + linear regression slope."""
-    y = np.array(data, dtype=float)
-    n = len(y)
+    ctx = as_context(data)
+    y = ctx.y
 
-    # Linear regression slope
-    x = np.arange(n)
-    slope, intercept, r_value, p_value_lr, std_err = stats.linregress(x, y)
-
-    # Mann-Kendall test (simplified)
-    s = 0
-    for i in range(n - 1):
-        for j in range(i + 1, n):
-            diff = y[j] - y[i]
-            if diff > 0:
-                s += 1
-            elif diff < 0:
-                s -= 1
-
-    var_s = n * (n - 1) * (2 * n + 5) / 18.0
+    # Linear regression slope (from the fused profiling kernel)
+    slope, r_squared = ctx.profile["slope"], ctx.profile["r_squared"]
+
+    # Mann-Kendall test (tie-corrected variance)
+    s, var_s = _mann_kendall_s(y)
     if s > 0:
         z_mk = (s - 1) / np.sqrt(var_s) if var_s > 0 else 0
     elif s < 0:
@@ -50,32 +43,61 @@ def trend_analysis(data: list) -> dict:
         "tool": "trend_analysis",
         "direction": direction,
         "slope": round(float(slope), 6),
-        "r_squared": round(float(r_value ** 2), 4),
+        "r_squared": round(float(r_squared), 4),
         "mann_kendall_z": round(float(z_mk), 4),
         "mann_kendall_p": round(float(mk_p), 4),
         "significant": mk_p < 0.05,
     }
 
 
+# Above this length the S statistic is counted in O(n log n) instead of pairwise.
+_MK_PAIRWISE_MAX = 1500
+
+
+def _mann_kendall_s(y: np.ndarray) -> tuple:
+    """Exact Mann-Kendall S and its tie-corrected variance.
+
+    Small series use the vectorized pairwise sign matrix. Longer ones count
+    concordant minus discordant pairs against the time index with the
+    merge-sort Kendall statistic (O(n log n)), recovering S from tau-b.
+    """
+    n = len(y)
+    if n < 2:
+        return 0, 0.0
+
+    _, ties = np.unique(y, return_counts=True)
+    ties = ties[ties > 1].astype(float)
+    var_s = (n * (n - 1) * (2 * n + 5)
+             - float(np.sum(ties * (ties - 1) * (2 * ties + 5)))) / 18.0
+
+    if n <= _MK_PAIRWISE_MAX:
+        signs = np.sign(y[None, :] - y[:, None])
+        return int(np.triu(signs, k=1).sum()), var_s
+
+    # tau_b = S / sqrt(n0 * (n0 - n_ties)); the time index has no ties
+    tau = stats.kendalltau(np.arange(n), y).statistic
+    if not np.isfinite(tau):
+        return 0, var_s
+    n0 = n * (n - 1) / 2.0
+    n_ties = float(np.sum(ties * (ties - 1) / 2.0))
+    return int(round(tau * np.sqrt(n0 * (n0 - n_ties)))), var_s
+
+
 def volatility_analysis(data: list) -> dict:
     """Volatility profiling with rolling statistics and GARCH-like metrics."""
-    y = np.array(data, dtype=float)
+    ctx = as_context(data)
+    y = ctx.y
     n = len(y)
-    mean_val = float(np.mean(y))
-    std_val = float(np.std(y))
+    mean_val = ctx.mean
+    std_val = ctx.std
 
-    # Rolling volatility (window = min(20, n//4))
-    win = max(3, min(20, n // 4))
-    rolling_std = []
-    for i in range(win, n):
-        rolling_std.append(float(np.std(y[i - win:i])))
-
-    # Coefficient of variation
-    cv = std_val / abs(mean_val) if abs(mean_val) > 1e-10 else float("inf")
+    # Rolling volatility (window = min(20, n//4)) over y[i-win:i], i = win..n-1
+    win = volatility_window(n)
+    rolling_std = rolling_std_windows(ctx.centered, win)
 
     # Volatility clustering: autocorrelation of squared returns
     if n > 10:
-        returns = np.diff(y)
+        returns = ctx.diff
         sq_returns = returns ** 2
         if len(sq_returns) > 5 and np.std(sq_returns) > 1e-10:
             vol_autocorr = float(np.corrcoef(sq_returns[:-1], sq_returns[1:])[0, 1])
@@ -84,6 +106,38 @@ def volatility_analysis(data: list) -> dict:
     else:
         vol_autocorr = 0.0
 
+    return _volatility_result(
+        mean_val, std_val, vol_autocorr, len(rolling_std),
+        float(np.mean(rolling_std)) if len(rolling_std) else 0.0,
+        float(rolling_std[0]) if len(rolling_std) else 0.0,
+        float(rolling_std[-1]) if len(rolling_std) else 0.0,
+    )
+
+
+def volatility_window(n: int) -> int:
+    return max(3, min(20, n // 4))
+
+
+def rolling_std_windows(y: np.ndarray, win: int) -> np.ndarray:
+    """Population std of every window ``y[i-win:i]`` for ``i = win..n-1``.
+
+    O(n) from cumulative sums; pass a mean-removed series for accuracy.
+    """
+    n = len(y)
+    if n <= win:
+        return np.array([])
+    s1 = np.concatenate(([0.0], np.cumsum(y)))
+    s2 = np.concatenate(([0.0], np.cumsum(y * y)))
+    ends = np.arange(win, n)
+    total = s1[ends] - s1[ends - win]
+    var = (s2[ends] - s2[ends - win] - total * total / win) / win
+    return np.sqrt(np.maximum(var, 0.0))
+
+
+def _volatility_result(mean_val, std_val, vol_autocorr, n_rolling,
+                       rolling_mean, rolling_first, rolling_last) -> dict:
+    # Coefficient of variation
+    cv = std_val / abs(mean_val) if abs(mean_val) > 1e-10 else float("inf")
     level = "high" if cv > 0.3 else "medium" if cv > 0.1 else "low"
 
     return {
@@ -92,67 +146,305 @@ def volatility_analysis(data: list) -> dict:
         "std": round(std_val, 4),
         "cv": round(float(cv), 4),
         "volatility_clustering": round(vol_autocorr, 4),
-        "rolling_std_mean": round(float(np.mean(rolling_std)), 4) if rolling_std else 0,
-        "rolling_std_trend": "increasing" if len(rolling_std) > 1 and rolling_std[-1] > rolling_std[0] else "stable",
+        "rolling_std_mean": round(rolling_mean, 4) if n_rolling else 0,
+        "rolling_std_trend": "increasing" if n_rolling > 1 and rolling_last > rolling_first else "stable",
     }
 
 
-def anomaly_detection(data: list) -> dict:
-    """Multi-method anomaly detection: 3-sigma, Isolation Forest, LOF."""
-    y = np.array(data, dtype=float).reshape(-1, 1)
+class StreamingVolatility:
+    """Point-by-point volatility profile for incremental feeds.
+
+    Keeps only the last ``window`` points: a sliding Welford window for the
+    rolling std, global Welford moments, running sums for the lag-1
+    autocorrelation of squared returns, and an EWMA variance of returns
+    (RiskMetrics-style, decay ``ewma_lambda``). ``profile()`` returns the
+    same dict as :func:`volatility_analysis`; fed one point at a time it
+    matches the batch result when ``window`` equals the batch window.
+    """
+
+    def __init__(self, window: int = 20, ewma_lambda: float = 0.94):
+        self.window = window
+        self.ewma_lambda = ewma_lambda
+        self._buf = deque(maxlen=window)
+        self._w_mean = 0.0
+        self._w_m2 = 0.0
+        self._since_resync = 0
+        self.count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._last = None
+        self._prev_sq = None
+        self._sq = [0, 0.0, 0.0]                 # count, sum, sum of squares
+        self._pairs = [0, 0.0, 0.0, 0.0, 0.0, 0.0]  # n, Σa, Σb, Σa², Σb², Σab
+        self.ewma_var = None
+        self._roll = [0, 0.0, 0.0, 0.0]          # count, sum, first, last
+
+    def update(self, x: float) -> dict:
+        """Add one observation; returns the current rolling and EWMA std."""
+        x = float(x)
+
+        # Rolling std of the window that ends just before this point
+        if len(self._buf) == self.window:
+            std_w = float(np.sqrt(max(self._w_m2 / self.window, 0.0)))
+            r = self._roll
+            if r[0] == 0:
+                r[2] = std_w
+            r[0] += 1
+            r[1] += std_w
+            r[3] = std_w
+            self._window_remove(self._buf[0])
+        self._buf.append(x)
+        self._window_add(x)
+
+        # Global moments (Welford)
+        self.count += 1
+        d = x - self._mean
+        self._mean += d / self.count
+        self._m2 += d * (x - self._mean)
+
+        # Returns: squared-return clustering and EWMA variance
+        if self._last is not None:
+            ret = x - self._last
+            sq = ret * ret
+            self._sq[0] += 1
+            self._sq[1] += sq
+            self._sq[2] += sq * sq
+            if self._prev_sq is not None:
+                p = self._pairs
+                p[0] += 1
+                p[1] += self._prev_sq
+                p[2] += sq
+                p[3] += self._prev_sq ** 2
+                p[4] += sq * sq
+                p[5] += self._prev_sq * sq
+            self._prev_sq = sq
+            lam = self.ewma_lambda
+            self.ewma_var = sq if self.ewma_var is None else lam * self.ewma_var + (1 - lam) * sq
+        self._last = x
+
+        return {
+            "rolling_std": self._roll[3] if self._roll[0] else None,
+            "ewma_std": float(np.sqrt(self.ewma_var)) if self.ewma_var is not None else None,
+        }
+
+    def extend(self, values) -> "StreamingVolatility":
+        for v in values:
+            self.update(v)
+        return self
+
+    def profile(self) -> dict:
+        """Volatility profile of everything seen so far."""
+        std_val = float(np.sqrt(self._m2 / self.count)) if self.count else 0.0
+        c, s, ss = self._sq
+        sq_std = np.sqrt(max(ss / c - (s / c) ** 2, 0.0)) if c else 0.0
+        vol_autocorr = 0.0
+        if self.count > 10 and c > 5 and sq_std > 1e-10:
+            m, sa, sb, saa, sbb, sab = self._pairs
+            den = np.sqrt(max(m * saa - sa * sa, 0.0) * max(m * sbb - sb * sb, 0.0))
+            vol_autocorr = float((m * sab - sa * sb) / den) if den > 0 else 0.0
+        r = self._roll
+        result = _volatility_result(self._mean, std_val, vol_autocorr, r[0],
+                                    r[1] / r[0] if r[0] else 0.0, r[2], r[3])
+        result["ewma_std"] = round(float(np.sqrt(self.ewma_var)), 4) if self.ewma_var is not None else 0
+        return result
+
+    def _window_add(self, x):
+        k = len(self._buf)
+        d = x - self._w_mean
+        self._w_mean += d / k
+        self._w_m2 += d * (x - self._w_mean)
+        self._since_resync += 1
+        if self._since_resync >= 4 * self.window:
+            # Re-derive from the buffer to stop add/remove round-off drifting
+            arr = np.fromiter(self._buf, dtype=float)
+            self._w_mean = float(arr.mean())
+            self._w_m2 = float(((arr - self._w_mean) ** 2).sum())
+            self._since_resync = 0
+
+    def _window_remove(self, x):
+        k = len(self._buf) - 1
+        if k <= 0:
+            self._w_mean, self._w_m2 = 0.0, 0.0
+            return
+        d = x - self._w_mean
+        self._w_mean -= d / k
+        self._w_m2 -= d * (x - self._w_mean)
+
+
+def anomaly_detection(data: list, mode: str = "fast", isolation: bool = True) -> dict:
+    """Multi-method anomaly detection with a consensus vote.
+
+    A point is reported when at least 2 of 3 methods agree: 3-sigma, an
+    isolation score and LOF. ``mode="fast"`` (default) uses univariate
+    detectors: a 1-D LOF on the sorted array and, if ``isolation``, a
+    histogram isolation score in place of IsolationForest; robust MAD
+    z-scores (global and around a rolling median) are reported alongside
+    but don't vote. ``mode="accurate"`` runs IsolationForest + LOF through
+    scikit-learn. ``isolation_forest_count`` is None when IsolationForest
+    did not run.
+    """
+    ctx = as_context(data)
+    y = ctx.y
     n = len(y)
-    mean_val, std_val = float(np.mean(y)), float(np.std(y))
+    mean_val, std_val = ctx.mean, ctx.std
 
     # 3-sigma
-    z_scores = np.abs((y.flatten() - mean_val) / std_val) if std_val > 1e-10 else np.zeros(n)
+    z_scores = np.abs((y - mean_val) / std_val) if std_val > 1e-10 else np.zeros(n)
     sigma_anomalies = [int(i) for i in np.where(z_scores > 3)[0]]
 
-    # Isolation Forest
-    if n >= 10:
-        iso = IsolationForest(contamination=0.05, random_state=42, n_estimators=100)
-        iso_labels = iso.fit_predict(y)
-        iso_anomalies = [int(i) for i in np.where(iso_labels == -1)[0]]
-    else:
-        iso_anomalies = []
-
-    # LOF
-    if n >= 10:
-        k = min(5, n - 1)
-        lof = LocalOutlierFactor(n_neighbors=k, contamination=0.05)
-        lof_labels = lof.fit_predict(y)
-        lof_anomalies = [int(i) for i in np.where(lof_labels == -1)[0]]
+    iso_anomalies = hist_anomalies = robust_anomalies = None
+    if mode == "accurate":
+        iso_anomalies, lof_anomalies = _sklearn_outliers(y)
+        isolation_votes = iso_anomalies
     else:
-        lof_anomalies = []
+        hist_anomalies = _histogram_isolation_outliers(y) if isolation and n >= 10 else []
+        lof_anomalies = _lof_1d_outliers(y) if n >= 10 else []
+        robust_anomalies = _robust_z_outliers(y)
+        isolation_votes = hist_anomalies
 
     # Consensus: flagged by at least 2 methods
-    all_idx = set(sigma_anomalies) | set(iso_anomalies) | set(lof_anomalies)
-    consensus = sorted([i for i in all_idx if sum([
-        i in sigma_anomalies, i in iso_anomalies, i in lof_anomalies
-    ]) >= 2])
+    votes = [set(sigma_anomalies), set(isolation_votes), set(lof_anomalies)]
+    all_idx = set().union(*votes)
+    consensus = sorted(i for i in all_idx if sum(i in v for v in votes) >= 2)
 
-    return {
+    result = {
         "tool": "anomaly_detection",
+        "mode": mode,
         "total_points": n,
         "sigma_count": len(sigma_anomalies),
-        "isolation_forest_count": len(iso_anomalies),
+        "isolation_forest_count": None if iso_anomalies is None else len(iso_anomalies),
         "lof_count": len(lof_anomalies),
         "consensus_anomalies": consensus[:20],  # cap for LLM context
         "consensus_count": len(consensus),
         "anomaly_ratio": round(len(consensus) / n, 4),
     }
+    if hist_anomalies is not None:
+        result["histogram_isolation_count"] = len(hist_anomalies)
+    if robust_anomalies is not None:
+        result["robust_z_count"] = len(robust_anomalies)
+    return result
 
 
-def stationarity_test(data: list) -> dict:
-    """ADF + KPSS stationarity tests."""
-    y = np.array(data, dtype=float)
+_CONTAMINATION = 0.05
+
+
+def _sklearn_outliers(y: np.ndarray) -> tuple:
+    """IsolationForest + LOF labels (the heavy, opt-in path)."""
+    n = len(y)
+    if n < 10:
+        return [], []
+    from sklearn.ensemble import IsolationForest
+    from sklearn.neighbors import LocalOutlierFactor
+
+    X = y.reshape(-1, 1)
+    iso = IsolationForest(contamination=_CONTAMINATION, random_state=42, n_estimators=100)
+    iso_labels = iso.fit_predict(X)
+    lof = LocalOutlierFactor(n_neighbors=min(5, n - 1), contamination=_CONTAMINATION)
+    lof_labels = lof.fit_predict(X)
+    return ([int(i) for i in np.where(iso_labels == -1)[0]],
+            [int(i) for i in np.where(lof_labels == -1)[0]])
+
+
+def _top_fraction(scores: np.ndarray) -> list:
+    """Indices whose score exceeds the (1 - contamination) percentile."""
+    threshold = np.percentile(scores, 100 * (1 - _CONTAMINATION))
+    return [int(i) for i in np.where(scores > threshold)[0]]
+
+
+def _lof_1d_outliers(y: np.ndarray, k: int = 5) -> list:
+    """Local Outlier Factor for 1-D data.
+
+    The neighbourhood of a point is every other point within its k-distance
+    (Breunig et al., 2000), ties included, so scores don't depend on how
+    equal distances are broken. With distinct distances it is exactly the k
+    nearest neighbours and the scores equal scikit-learn's. Duplicates share
+    one score, so the work is on the unique values: in sorted order the
+    neighbourhood lies within k positions on either side, O(m k) with no tree.
+    """
+    n = len(y)
+    k = min(k, n - 1)
+    u, inverse, counts = np.unique(y, return_inverse=True, return_counts=True)
+    m = len(u)
+    copies = counts - 1  # other points at distance 0
+
+    offsets = np.concatenate((np.arange(-k, 0), np.arange(1, k + 1)))
+    cand = np.arange(m)[:, None] + offsets[None, :]
+    valid = (cand >= 0) & (cand < m)
+    cand = np.clip(cand, 0, m - 1)
+    dist = np.where(valid, np.abs(u[cand] - u[:, None]), np.inf)
+    weight = np.where(valid, counts[cand], 0)
+
+    # Visit neighbours nearest first, as scikit-learn sums them
+    by_dist = np.argsort(dist, axis=1, kind="stable")
+    cand, dist, weight = (np.take_along_axis(a, by_dist, axis=1) for a in (cand, dist, weight))
+
+    # k-distance: distance to the k-th nearest other point, counting copies first
+    reached = copies[:, None] + np.cumsum(weight, axis=1) >= k
+    k_dist = np.where(copies >= k, 0.0, dist[np.arange(m), np.argmax(reached, axis=1)])
+
+    inside = np.where(dist <= k_dist[:, None], weight, 0)
+    dist = np.where(inside > 0, dist, 0.0)
+    size = copies + inside.sum(axis=1)
+    reach = copies * k_dist
+    for j in range(inside.shape[1]):
+        reach = reach + inside[:, j] * np.maximum(k_dist[cand[:, j]], dist[:, j])
+    lrd = 1.0 / (reach / size + 1e-10)
+    ratio = copies.astype(float)
+    for j in range(inside.shape[1]):
+        ratio = ratio + inside[:, j] * (lrd[cand[:, j]] / lrd)
+    lof = ratio / size
+    return _top_fraction(lof[inverse])
+
+
+def _histogram_isolation_outliers(y: np.ndarray) -> list:
+    """Isolation score ``-log(bin density)`` on a histogram; sparse bins isolate fast."""
+    n = len(y)
+    bins = max(5, int(np.ceil(np.sqrt(n))))
+    counts, edges = np.histogram(y, bins=bins)
+    idx = np.clip(np.searchsorted(edges, y, side="right") - 1, 0, bins - 1)
+    scores = -np.log(counts[idx] / n)
+    return _top_fraction(scores)
 
-    # ADF test (H0: unit root exists = non-stationary)
+
+def _robust_z_outliers(y: np.ndarray, threshold: float = 3.5) -> list:
+    """Modified z-scores (median/MAD), globally and around a rolling median."""
+    n = len(y)
+    flagged = _mad_z(y - np.median(y)) > threshold
+    win = min(51, max(5, n // 10)) | 1
+    if n > win:
+        half = win // 2
+        padded = np.pad(y, half, mode="edge")
+        local = np.median(np.lib.stride_tricks.sliding_window_view(padded, win), axis=1)
+        flagged |= _mad_z(y - local) > threshold
+    return [int(i) for i in np.where(flagged)[0]]
+
+
+def _mad_z(dev: np.ndarray) -> np.ndarray:
+    mad = float(np.median(np.abs(dev - np.median(dev))))
+    if mad > 1e-10:
+        return np.abs(0.6745 * (dev - np.median(dev)) / mad)
+    mean_ad = float(np.mean(np.abs(dev - np.mean(dev))))
+    if mean_ad > 1e-10:
+        return np.abs((dev - np.median(dev)) / (1.253314 * mean_ad))
+    return np.zeros(len(dev))
+
+
+def stationarity_test(data: list) -> dict:
+    """ADF + KPSS stationarity tests (memoized per series)."""
+    ctx = as_context(data)
+    cache_key = ("stationarity", ctx.fingerprint)
+    hit = UNITROOT_CACHE.get(cache_key)
+    if hit is not None:
+        return dict(hit)
+    y = ctx.y
+
+    # ADF test (H0: unit root exists = non-stationary); one QR for all lags
     try:
-        adf_stat, adf_p, adf_lags, _, adf_crit, _ = adfuller(y, autolag="AIC")
+        adf = adf_test(y, key=ctx.fingerprint)
+        adf_stat, adf_p = adf["statistic"], adf["p_value"]
         adf_stationary = adf_p < 0.05
     except Exception:
         adf_stat, adf_p, adf_stationary = 0, 1, False
-        adf_crit = {}
 
     # KPSS test (H0: stationary)
     try:
@@ -170,7 +462,7 @@ def stationarity_test(data: list) -> dict:
     else:
         verdict = "trend_stationary" if adf_stationary else "difference_stationary"
 
-    return {
+    result = {
         "tool": "stationarity_test",
         "verdict": verdict,
         "adf_statistic": round(float(adf_stat), 4),
@@ -180,11 +472,14 @@ def stationarity_test(data: list) -> dict:
         "kpss_p_value": round(float(kpss_p), 4),
         "kpss_stationary": kpss_stationary,
     }
+    UNITROOT_CACHE.put(cache_key, result, 512)
+    return dict(result)
 
 
 def distribution_test(data: list) -> dict:
     """Shapiro-Wilk normality + KS test against normal distribution."""
-    y = np.array(data, dtype=float)
+    ctx = as_context(data)
+    y = ctx.y
     n = len(y)
 
     # Shapiro-Wilk (works best for n < 5000)
@@ -196,12 +491,12 @@ def distribution_test(data: list) -> dict:
 
     # KS test against normal
     try:
-        ks_stat, ks_p = stats.kstest(y, "norm", args=(np.mean(y), np.std(y)))
+        ks_stat, ks_p = stats.kstest(y, "norm", args=(ctx.mean, ctx.std))
     except Exception:
         ks_stat, ks_p = 0, 0
 
-    skewness = float(stats.skew(y))
-    kurt = float(stats.kurtosis(y))
+    skewness = ctx.profile["skewness"]
+    kurt = ctx.profile["kurtosis"]
 
     return {
         "tool": "distribution_test",
@@ -216,44 +511,81 @@ def distribution_test(data: list) -> dict:
     }
 
 
-def changepoint_detection(data: list) -> dict:
-    """PELT-style changepoint detection using cumulative sum."""
-    y = np.array(data, dtype=float)
+# Above this many points PELT runs on a grid of PELT_GRID candidate boundaries
+PELT_EXACT_LIMIT = 20000
+PELT_GRID = 4000
+
+
+def changepoint_detection(data: list, method: str = "binseg",
+                          min_size: int = 2, penalty: float = None) -> dict:
+    """Changepoint detection on an O(1) segment-cost engine.
+
+    Segment cost is ``len * var`` from prefix sums of y and y^2.
+    ``method="binseg"`` is binary segmentation with at most 10 splits, and
+    ``method="pelt"`` is penalised segmentation with PELT pruning, exact up
+    to ``PELT_EXACT_LIMIT`` points and grid-then-refine above it.
+    ``penalty`` defaults to the BIC-style ``3 * log(n) * var(y)``.
+    """
+    ctx = as_context(data)
+    y = ctx.y
     n = len(y)
 
     if n < 10:
         return {"tool": "changepoint_detection", "changepoints": [], "count": 0}
 
-    # Binary segmentation approach
-    def _cost(segment):
-        if len(segment) < 2:
-            return 0
-        return len(segment) * np.var(segment)
-
-    def _find_best_split(arr, start_idx):
-        best_gain, best_pos = -1, -1
-        base_cost = _cost(arr)
-        for i in range(2, len(arr) - 2):
-            gain = base_cost - _cost(arr[:i]) - _cost(arr[i:])
-            if gain > best_gain:
-                best_gain = gain
-                best_pos = start_idx + i
-        return best_pos, best_gain
-
-    # Penalty based on BIC
-    penalty = 3 * np.log(n) * np.var(y)
-    changepoints = []
+    cost = _SegmentCost(y)
+    if penalty is None:
+        penalty = 3 * np.log(n) * ctx.var
+
+    if method == "pelt":
+        changepoints = _pelt(cost, n, penalty, max(1, min_size))
+    else:
+        changepoints = _binary_segmentation(cost, n, penalty, max(1, min_size))
+
+    bounds = [0] + changepoints + [n]
+    segments = list(zip(bounds[:-1], bounds[1:]))
 
+    return {
+        "tool": "changepoint_detection",
+        "changepoints": changepoints,
+        "count": len(changepoints),
+        "segment_means": [round(float(cost.mean(s, e)), 4) for s, e in segments],
+    }
+
+
+class _SegmentCost:
+    """O(1) Gaussian segment cost ``len * var`` via prefix sums."""
+
+    def __init__(self, y: np.ndarray):
+        self.offset = float(np.mean(y))
+        c = y - self.offset  # centering keeps the sums well conditioned
+        self.s1 = np.concatenate(([0.0], np.cumsum(c)))
+        self.s2 = np.concatenate(([0.0], np.cumsum(c * c)))
+
+    def __call__(self, start, end):
+        """Cost of y[start:end]; ``start``/``end`` may be arrays."""
+        length = np.maximum(end - start, 1)
+        total = self.s1[end] - self.s1[start]
+        return np.maximum(self.s2[end] - self.s2[start] - total * total / length, 0.0)
+
+    def mean(self, start, end):
+        return (self.s1[end] - self.s1[start]) / (end - start) + self.offset
+
+
+def _binary_segmentation(cost, n, penalty, min_size):
+    """Greedy binary segmentation; each split search is one vectorized pass."""
     segments = [(0, n)]
+    changepoints = []
     for _ in range(min(10, n // 10)):
         best_cp, best_g, best_seg = -1, -1, -1
         for idx, (s, e) in enumerate(segments):
-            seg = y[s:e]
-            if len(seg) < 6:
+            if e - s < max(6, 3 * min_size):
                 continue
-            pos, gain = _find_best_split(seg, s)
-            if gain > best_g:
-                best_g, best_cp, best_seg = gain, pos, idx
+            splits = np.arange(s + min_size, e - min_size)
+            gains = cost(s, e) - cost(s, splits) - cost(splits, e)
+            i = int(np.argmax(gains))
+            if gains[i] > best_g:
+                best_g, best_cp, best_seg = float(gains[i]), int(splits[i]), idx
         if best_g > penalty and best_seg >= 0:
             s, e = segments[best_seg]
             segments[best_seg] = (s, best_cp)
@@ -261,29 +593,92 @@ def changepoint_detection(data: list) -> dict:
             changepoints.append(best_cp)
         else:
             break
+    return sorted(changepoints)
+
+
+def _pelt(cost, n, penalty, min_size):
+    """PELT (Killick et al., 2012): optimal partition with candidate pruning.
+
+    Pruning keeps about ``n / segments`` candidate starts alive, so with few
+    changepoints the cost grows quadratically. Above ``PELT_EXACT_LIMIT``
+    points the partition is solved on a grid of ``PELT_GRID`` candidate
+    boundaries and each changepoint is then refined exactly within one grid
+    step of where it landed.
+    """
+    if n <= PELT_EXACT_LIMIT:
+        return _pelt_on(cost, np.arange(n + 1), penalty, min_size)
+    step = -(-n // PELT_GRID)
+    grid = np.unique(np.append(np.arange(0, n, step), n))
+    coarse = _pelt_on(cost, grid, penalty, max(min_size, step))
+    return _refine(cost, n, coarse, step, min_size)
+
+
+def _pelt_on(cost, pos, penalty, min_size):
+    """PELT over the candidate boundaries ``pos`` (sorted, from 0 to n)."""
+    n_pos = len(pos) - 1
+    F = np.full(n_pos + 1, np.inf)
+    F[0] = -penalty
+    last = np.zeros(n_pos + 1, dtype=int)
+    # Candidate starts (indices into ``pos``), kept sorted in a preallocated
+    # buffer; the admissible ones (gap >= min_size) always form a prefix.
+    buf = np.empty(n_pos + 1, dtype=int)
+    buf[0], size = 0, 1
+
+    for t in range(1, n_pos + 1):
+        candidates = buf[:size]
+        m = int(np.searchsorted(pos[candidates], pos[t] - min_size, side="right"))
+        if m:
+            totals = F[candidates[:m]] + cost(pos[candidates[:m]], pos[t])
+            k = int(np.argmin(totals))
+            F[t] = totals[k] + penalty
+            last[t] = candidates[k]
+            # Prune: a start already worse than F[t] can never win later
+            keep = totals <= F[t]
+            kept = int(keep.sum())
+            if kept < m:
+                buf[:kept] = candidates[:m][keep]
+                buf[kept:kept + size - m] = buf[m:size]
+                size = kept + size - m
+        if np.isfinite(F[t]) and pos[t] + min_size <= pos[-1]:
+            buf[size] = t
+            size += 1
 
-    changepoints.sort()
-
-    return {
-        "tool": "changepoint_detection",
-        "changepoints": changepoints,
-        "count": len(changepoints),
-        "segment_means": [round(float(np.mean(y[s:e])), 4) for s, e in segments],
-    }
+    changepoints = []
+    t = n_pos
+    while t > 0:
+        t = int(last[t])
+        if t > 0:
+            changepoints.append(int(pos[t]))
+    return sorted(changepoints)
+
+
+def _refine(cost, n, changepoints, radius, min_size):
+    """Move each changepoint to the best split within ``radius`` of it."""
+    refined = list(changepoints)
+    for i, cp in enumerate(refined):
+        s = refined[i - 1] if i else 0
+        e = refined[i + 1] if i + 1 < len(refined) else n
+        lo, hi = max(s + min_size, cp - radius), min(e - min_size, cp + radius)
+        if lo > hi:
+            continue
+        splits = np.arange(lo, hi + 1)
+        refined[i] = int(splits[np.argmin(cost(s, splits) + cost(splits, e))])
+    return refined
 
 
 def correlation_analysis(data: list) -> dict:
     """ACF, PACF, and dominant lag detection."""
-    y = np.array(data, dtype=float)
+    ctx = as_context(data)
+    y = ctx.y
     n = len(y)
     max_lag = min(40, n // 3)
 
     if max_lag < 2:
         return {"tool": "correlation_analysis", "dominant_lag": 0, "has_seasonality": False}
 
-    acf_vals = acf(y, nlags=max_lag, fft=True)
+    acf_vals = ctx.acf(max_lag)
     try:
-        pacf_vals = pacf(y, nlags=max_lag, method="ywm")
+        pacf_vals = ctx.pacf(max_lag)
     except Exception:
         pacf_vals = np.zeros(max_lag + 1)
 
@@ -314,6 +709,8 @@ def correlation_analysis(data: list) -> dict:
 
 
 # --- Tool Registry ---
+# Entries with ``requires`` are auto-scheduled by the reasoning engine once
+# those tools have finished and ``condition(results)`` (if any) holds.
 STATISTICAL_TOOLS = {
     "trend_analysis": {
         "fn": trend_analysis,
@@ -327,8 +724,11 @@ STATISTICAL_TOOLS = {
     },
     "anomaly_detection": {
         "fn": anomaly_detection,
-        "description": "Multi-method anomaly detection (3-sigma, IsolationForest, LOF). Use when outliers may affect forecasting.",
+        "description": "Multi-method anomaly detection (3-sigma, 1-D LOF, robust MAD z, histogram isolation). Use when outliers may affect forecasting.",
         "triggers": ["anomaly", "outlier", "spike"],
+        "requires": ["volatility_analysis"],
+        "condition": lambda p: p["volatility_analysis"].get("level") == "high",
+        "priority": 11,
     },
     "stationarity_test": {
         "fn": stationarity_test,
@@ -342,8 +742,10 @@ STATISTICAL_TOOLS = {
     },
     "changepoint_detection": {
         "fn": changepoint_detection,
-        "description": "Binary segmentation changepoint detection. Use when regime shifts or structural breaks are suspected.",
+        "description": "Binary segmentation / PELT changepoint detection. Use when regime shifts or structural breaks are suspected.",
         "triggers": ["changepoint", "regime", "shift", "break"],
+        "requires": [],
+        "priority": 90,
     },
     "correlation_analysis": {
         "fn": correlation_analysis,
@@ -4,13 +4,15 @@
 
 import numpy as np
 
+from .context import as_context
+
 
 def prediction_range_check(data: list, predictions: list) -> dict:
     """Check if predictions fall within reasonable statistical bounds."""
-    y = np.array(data, dtype=float)
+    ctx = as_context(data)
     preds = np.array(predictions, dtype=float)
-    mean_val = float(np.mean(y))
-    std_val = float(np.std(y))
+    mean_val = ctx.mean
+    std_val = ctx.std
 
     lower = mean_val - 3 * std_val
     upper = mean_val + 3 * std_val
@@ -32,12 +34,12 @@ def prediction_range_check(data: list, predictions: list) -> dict:
 
 def trend_consistency_check(data: list, predictions: list) -> dict:
     """Check if predictions maintain the historical trend direction."""
-    y = np.array(data, dtype=float)
+    ctx = as_context(data)
+    y = ctx.y
     preds = np.array(predictions, dtype=float)
 
     # Historical trend
-    x_hist = np.arange(len(y))
-    hist_slope = float(np.polyfit(x_hist, y, 1)[0])
+    hist_slope = ctx.linfit[0]
 
     # Prediction trend
     x_pred = np.arange(len(preds))
@@ -45,7 +47,7 @@ def trend_consistency_check(data: list, predictions: list) -> dict:
 
     # Continuity: gap between last historical and first prediction
     gap = abs(float(preds[0] - y[-1]))
-    gap_ratio = gap / (float(np.std(y)) + 1e-10)
+    gap_ratio = gap / (ctx.std + 1e-10)
 
     consistent = (hist_slope * pred_slope >= 0) or abs(hist_slope) < 1e-6
 
@@ -62,19 +64,20 @@ def trend_consistency_check(data: list, predictions: list) -> dict:
 
 def confidence_scoring(data: list, predictions: list) -> dict:
     """Compute confidence score based on multiple validation checks."""
-    y = np.array(data, dtype=float)
+    ctx = as_context(data)
+    y = ctx.y
     preds = np.array(predictions, dtype=float)
     score = 1.0
 
     # Penalize range violations
-    std_val = float(np.std(y))
-    mean_val = float(np.mean(y))
+    std_val = ctx.std
+    mean_val = ctx.mean
     for p in preds:
         if abs(p - mean_val) > 3 * std_val:
             score *= 0.85
 
     # Penalize trend inconsistency
-    hist_slope = float(np.polyfit(np.arange(len(y)), y, 1)[0])
+    hist_slope = ctx.linfit[0]
     if len(preds) > 1:
         pred_slope = float(np.polyfit(np.arange(len(preds)), preds, 1)[0])
         if hist_slope * pred_slope < 0 and abs(hist_slope) > 1e-4:
@@ -1,6 +1,8 @@
-from flask import Flask, request, jsonify, send_from_directory, g
+from flask import Flask, request, jsonify, send_from_directory, g, Response, stream_with_context
 from flask_cors import CORS
 import os
+import json
+import threading
 import pandas as pd
 import numpy as np
 from scipy.signal import savgol_filter
@@ -43,12 +45,16 @@ app.register_blueprint(admin_bp)
 
 # 创建数据库表
 with app.app_context():
-    from models.db_models import User, Post, Comment, PostLike, RedeemCode, DailyUsage, CreditLog
+    from models.db_models import User, Post, Comment, PostLike, RedeemCode, DailyUsage, CreditLog, ConversationSession
     try:
         db.create_all()
     except Exception:
         pass
 
+# 对话会话存储（CHAT_SESSION_STORE=db 时使用应用数据库）
+from models.session_store import SESSION_STORE, session_key
+SESSION_STORE.init_app(app)
+
 # --- 定义路径 ---
 STATIC_DATA_DIR = 'static_data'
 UPLOADS_DIR = 'uploads'
@@ -92,27 +98,44 @@ def _should_think(message: str) -> bool:
 
 def _format_trajectory(trajectory: dict) -> list:
     """将推理轨迹格式化为前端可展示的结构。"""
-    steps = trajectory.get("steps", [])
-    formatted = []
-    for s in steps:
-        obs = s.get("observation", {})
-        # 生成简洁的结果摘要
-        summary_parts = []
-        for k, v in obs.items():
-            if k == "tool":
-                continue
-            sv = str(v)
-            if len(sv) > 50:
-                sv = sv[:47] + "..."
-            summary_parts.append(f"{k}={sv}")
-        formatted.append({
-            "step": s["step"],
-            "thought": s["thought"],
-            "tool": s["action"],
-            "result": ", ".join(summary_parts) if summary_parts else "done",
-            "time": s.get("timestamp", 0)
-        })
-    return formatted
+    return [_format_step(s) for s in trajectory.get("steps", [])]
+
+def _format_step(s: dict) -> dict:
+    """格式化单个推理步骤。"""
+    obs = s.get("observation", {})
+    # 生成简洁的结果摘要
+    summary_parts = []
+    for k, v in obs.items():
+        if k == "tool":
+            continue
+        sv = str(v)
+        if len(sv) > 50:
+            sv = sv[:47] + "..."
+        summary_parts.append(f"{k}={sv}")
+    return {
+        "step": s["step"],
+        "thought": s["thought"],
+        "tool": s["action"],
+        "result": ", ".join(summary_parts) if summary_parts else "done",
+        "time": s.get("timestamp", 0)
+    }
+
+# --- 流式推理 (Server-Sent Events) ---
+def _wants_stream() -> bool:
+    """客户端通过 stream=1 或 Accept: text/event-stream 请求流式响应。"""
+    flag = request.values.get('stream', '').lower()
+    return flag in ('1', 'true', 'yes') or \
+        request.accept_mimetypes.best == 'text/event-stream'
+
+def _sse(event: str, data) -> str:
+    """编码一个 SSE 事件。"""
+    payload = json.dumps(_sanitize(data), ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+def _sse_response(events):
+    """包装 SSE 生成器；关闭代理缓冲，使每个事件立即下发。"""
+    return Response(stream_with_context(events), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 # --- API 路由 ---
 
@@ -223,6 +246,8 @@ def agent_message():
 
     if not user_message:
         return jsonify({"error": "消息内容不能为空"}), 400
+    if not isinstance(session_id, str) or len(session_id) > 256:
+        return jsonify({"error": "session_id 无效"}), 400
 
     # 简单问候直接返回静态回复，不消耗配额和AI调用
     _GREETING_KEYWORDS = ['你好', '您好', 'hello', 'hi', '嗨', '在吗']
@@ -241,7 +266,9 @@ def agent_message():
         return jsonify({"error": err}), 403
 
     try:
-        agent_reply = get_conversational_response(user_message, session_id)
+        # 会话 id 由客户端生成且会被持久化：按用户隔离并哈希成定长键
+        agent_reply = get_conversational_response(
+            user_message, session_key(g.user_id, session_id))
     except Exception as e:
         return jsonify({"reply": "抱歉，AI服务暂时不可用，请稍后再试。"}), 200
 
@@ -272,6 +299,11 @@ def agent_upload_predict():
         filepath = os.path.join(UPLOADS_DIR, filename)
         file.save(filepath)
 
+        # 流式：分析与报告都在生成器内进行，首字节不必等待任何计算
+        if _wants_stream():
+            return _sse_response(_stream_upload_predict(
+                filepath, _should_think(user_message)))
+
         try:
             # 1. ARIMA 基础分析
             analysis_result = analyze_and_predict(filepath)
@@ -317,6 +349,82 @@ def agent_upload_predict():
 
     return jsonify({"error": "文件上传失败"}), 500
 
+def _stream_upload_predict(filepath, think):
+    """agent-upload-predict 的流式版本。
+
+    事件顺序: analysis（图表数据）→ step* / thinking / report → done
+    （与非流式响应相同的完整结果）。报告生成与智能预测在后台线程中
+    与思考模式并行执行，报告一就绪即下发；推理失败时下发 error 事件。
+    """
+    try:
+        analysis_result = analyze_and_predict(filepath)
+    except Exception as e:
+        yield _sse("error", {"error": f"数据分析失败: {str(e)}"})
+        return
+    chart_data = analysis_result.get("chart_data", None)
+    yield _sse("analysis", {"chart_data": chart_data})
+
+    summary = analysis_result.get("summary_stats", {})
+    data_y = summary.get("historical_y", [])
+    forecast_steps = summary.get("forecast_steps", 10)
+
+    def run(target, holder, *args):
+        def body():
+            try:
+                holder["result"] = target(*args)
+            except Exception as e:
+                holder["error"] = e
+        thread = threading.Thread(target=body, daemon=True)
+        thread.start()
+        return thread
+
+    report_holder, smart_holder = {}, {}
+    report_thread = run(generate_standalone_report, report_holder, analysis_result)
+    smart_thread = None
+    if len(data_y) >= 10:
+        smart_thread = run(lambda: smart_predict(data_y, steps=forecast_steps), smart_holder)
+
+    def report_event():
+        if "error" in report_holder:
+            return _sse("error", {"error": f"数据分析失败: {str(report_holder['error'])}"})
+        return _sse("report", {"report": report_holder.get("result"), "chart_data": chart_data})
+
+    report_sent = False
+    thinking_result = None
+    if think and len(data_y) >= 10:
+        try:
+            for event, payload in TSReasoner().predict_stream(data_y, steps=forecast_steps):
+                if event == "step":
+                    yield _sse("step", _format_step(payload))
+                elif event == "result":
+                    thinking_result = _sanitize({
+                        "trajectory": _format_trajectory(payload.get("trajectory", {})),
+                        "data_profile": payload.get("data_profile", {}),
+                        "predictions": payload.get("predictions", []),
+                        "confidence": payload.get("confidence", {}),
+                    })
+                    yield _sse("thinking", thinking_result)
+                elif event == "error":
+                    yield _sse("error", {"error": f"推理失败: {payload}"})
+                if not report_sent and not report_thread.is_alive():
+                    report_sent = True
+                    yield report_event()
+        except Exception as e:
+            # 推理中途失败：报告与智能预测仍照常下发
+            yield _sse("error", {"error": f"推理失败: {str(e)}"})
+
+    report_thread.join()
+    if not report_sent:
+        yield report_event()
+    if smart_thread is not None:
+        smart_thread.join()
+    yield _sse("done", {
+        "report": report_holder.get("result"),
+        "chart_data": chart_data,
+        "smart_prediction": smart_holder.get("result"),
+        "thinking": thinking_result,
+    })
+
 @app.route('/api/smart-predict', methods=['POST'])
 def smart_predict_api():
     """【鼠先知智能预测引擎API】: 接收文件，执行三阶段Agent协作预测。"""
@@ -381,6 +489,8 @@ def agent_reason():
                 return jsonify({"error": f"有效数据点过少({len(data_y)}个)，至少需要10个"}), 400
 
             reasoner = TSReasoner()
+            if _wants_stream():
+                return _sse_response(_stream_reason(reasoner, data_y, steps))
             result = reasoner.predict(data_y, steps=steps)
             return jsonify(_sanitize(result))
         except Exception as e:
@@ -388,6 +498,13 @@ def agent_reason():
 
     return jsonify({"error": "文件上传失败"}), 500
 
+def _stream_reason(reasoner, data_y, steps):
+    """agent-reason 的流式版本: 每个推理步骤一个 step 事件，最后 result（含预测与区间）。"""
+    for event, payload in reasoner.predict_stream(data_y, steps=steps):
+        if event == "error":
+            payload = {"error": f"推理失败: {payload}"}
+        yield _sse(event, payload)
+
 # --- 服务前端静态文件的路由 ---
 # 这个路由捕获所有不是API的请求
 @app.route('/', defaults={'path': ''})
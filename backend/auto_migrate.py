@@ -77,6 +77,21 @@ def migrate():
             )
         """)
 
+    if not table_exists(cursor, 'conversation_session'):
+        print("[migrate] 创建 conversation_session 表")
+        cursor.execute("""
+            CREATE TABLE conversation_session (
+                session_id VARCHAR(128) PRIMARY KEY,
+                state TEXT NOT NULL,
+                rev VARCHAR(32) NOT NULL,
+                updated_at FLOAT NOT NULL
+            )
+        """)
+        cursor.execute(
+            "CREATE INDEX ix_conversation_session_updated_at "
+            "ON conversation_session (updated_at)"
+        )
+
     conn.commit()
     conn.close()
     print("[migrate] 迁移完成")
@@ -2,45 +2,54 @@
 
 import os
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
 from langchain.chains import ConversationChain
 from langchain.memory import ConversationBufferMemory
 from langchain_core.prompts.chat import MessagesPlaceholder
 from langchain_core.prompts import ChatPromptTemplate
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 import json
 import re
 import numpy as np
+from agent.cache import LRUCache, RESULT_CACHE, approx_nbytes, fingerprint
+from agent.llm_cache import CachedLLMChain
+from agent.llm_clients import get_chat_model
+from agent.tools import SeriesContext
+from agent.tools.autocorr import lag_correlation
+from agent.tools.profiling import insights_from_profile, seasonality_lag
+from models.chat_memory import RollingSummaryMemory, memory_state, restore_memory
+from models.session_store import (CHAT_MAX_SESSIONS, CHAT_SESSION_TTL, SESSION_STORE,
+                                  new_rev)
 
 # --- 加载环境变量并自动识别 API 提供商 ---
 load_dotenv()
 
 def _detect_llm():
-    """根据 API Key 或 Base URL 自动识别 Kimi / GLM 并实例化模型"""
+    """根据 API Key 或 Base URL 自动识别 Kimi / GLM，返回共享的模型实例（连接池复用）"""
     api_key = os.getenv("OPENAI_API_KEY", "")
     api_base = os.getenv("OPENAI_API_BASE", "")
 
     # 按 base URL 识别
     if "moonshot" in api_base:
-        return ChatOpenAI(model_name="moonshot-v1-8k", openai_api_key=api_key,
-                          openai_api_base=api_base, temperature=0.7)
+        return get_chat_model("moonshot-v1-8k", api_key, api_base, temperature=0.7)
     if "bigmodel" in api_base:
-        return ChatOpenAI(model_name="glm-4-flash", openai_api_key=api_key,
-                          openai_api_base=api_base, temperature=0.7)
+        return get_chat_model("glm-4-flash", api_key, api_base, temperature=0.7)
 
     # 无 base URL 时按 key 前缀猜测
     if api_key.startswith("sk-") and len(api_key) > 50:
         # 智谱 key 通常较长（含 . 分隔）
         if "." in api_key:
-            return ChatOpenAI(model_name="glm-4-flash", openai_api_key=api_key,
-                              openai_api_base="https://open.bigmodel.cn/api/paas/v4/", temperature=0.7)
-        return ChatOpenAI(model_name="moonshot-v1-8k", openai_api_key=api_key,
-                          openai_api_base="https://api.moonshot.cn/v1", temperature=0.7)
+            return get_chat_model("glm-4-flash", api_key,
+                                  "https://open.bigmodel.cn/api/paas/v4/", temperature=0.7)
+        return get_chat_model("moonshot-v1-8k", api_key,
+                              "https://api.moonshot.cn/v1", temperature=0.7)
 
     # 默认 GLM
-    return ChatOpenAI(model_name="glm-4-flash", openai_api_key=api_key,
-                      openai_api_base="https://open.bigmodel.cn/api/paas/v4/", temperature=0.7)
+    return get_chat_model("glm-4-flash", api_key,
+                          "https://open.bigmodel.cn/api/paas/v4/", temperature=0.7)
 
 llm = _detect_llm()
 
@@ -82,97 +91,94 @@ PROMPT = ChatPromptTemplate.from_messages([
     ("human", "{input}"),
 ])
 
-conversation_sessions = {}
+# 对话记忆模式：summary = 最近 N 轮原文 + 滚动摘要（token 有界），buffer = 完整历史
+CHAT_MEMORY = os.getenv("CHAT_MEMORY", "summary").lower()
+
+# session_id -> _Session（本进程的对话链 + 最近一次同步的 rev）；记忆状态以
+# SESSION_STORE 为准，每轮读取、写回，多个 worker 可以轮流服务同一会话
+conversation_sessions = LRUCache(max_entries=CHAT_MAX_SESSIONS,
+                                 max_bytes=1 << 62, ttl=CHAT_SESSION_TTL)
+
+
+class _Session:
+    __slots__ = ("chain", "rev")
+
+    def __init__(self, chain, rev=None):
+        self.chain = chain
+        self.rev = rev
 
 def analyze_data_insights(data_y: list) -> dict:
     """
     使用Python统计分析数据特征（不耗token）
     返回数据洞察，供LLM生成报告使用
     """
-    y = np.array(data_y)
-
-    # 基础统计
-    mean_val = float(np.mean(y))
-    std_val = float(np.std(y))
-
-    # 趋势检测（线性拟合斜率）
-    x = np.arange(len(y))
-    slope = float(np.polyfit(x, y, 1)[0])
-    trend = "上升" if slope > 0.01 else "下降" if slope < -0.01 else "平稳"
-
-    # 波动性
-    volatility = "高" if std_val > abs(mean_val) * 0.3 else "中" if std_val > abs(mean_val) * 0.1 else "低"
-
-    # 异常值检测（3-sigma规则）
-    z_scores = np.abs((y - mean_val) / std_val) if std_val > 0 else np.zeros_like(y)
-    anomaly_count = int(np.sum(z_scores > 3))
-
-    # 周期性检测（简单自相关）
-    if len(y) > 20:
-        lag = min(12, len(y) // 4)
-        autocorr = float(np.corrcoef(y[:-lag], y[lag:])[0, 1]) if len(y) > lag else 0
-        has_seasonality = abs(autocorr) > 0.5
-    else:
-        has_seasonality = False
-
-    return {
-        "trend": trend,
-        "volatility": volatility,
-        "anomaly_count": anomaly_count,
-        "has_seasonality": has_seasonality,
-        "mean": round(mean_val, 3),
-        "std": round(std_val, 3)
-    }
+    # 单次融合扫描得到全部 FAP 特征（均值/标准差/斜率/异常点/偏峰度）
+    ctx = SeriesContext(data_y)
+    cache_key = ("insights", ctx.fingerprint)
+    insights = RESULT_CACHE.get(cache_key)
+    if insights is None:
+        lag_corr = None
+        if ctx.n > 20:
+            lag_corr = lag_correlation(ctx.y, seasonality_lag(ctx.n), key=ctx.fingerprint)
+        insights = insights_from_profile(ctx.profile, lag_corr)
+        RESULT_CACHE.put(cache_key, insights, approx_nbytes(insights))
+    return dict(insights)
 
 def get_conversational_response(user_input: str, session_id: str = "default_session"):
     """
     处理用户的文本对话输入，返回模型的文本回复。
     """
-    if session_id not in conversation_sessions:
-        conversation_sessions[session_id] = ConversationBufferMemory(return_messages=True)
-    
-    memory = conversation_sessions[session_id]
-
-    conversation_chain = ConversationChain(
-        llm=llm,
-        prompt=PROMPT,
-        memory=memory,
-        verbose=True
-    )
-
-    response = conversation_chain.predict(input=user_input)
+    # 清理空闲超时的会话，进程内存保持有界
+    conversation_sessions.purge_expired()
+
+    # 每个会话在本进程只构建一次对话链，之后的消息直接复用
+    session = conversation_sessions.get(session_id)
+    if session is None:
+        memory = _new_memory()
+        session = _Session(ConversationChain(
+            llm=llm,
+            prompt=PROMPT,
+            memory=memory,
+            verbose=False
+        ))
+        if isinstance(memory, RollingSummaryMemory):
+            # 后台摘要完成后把折叠后的状态写回存储，别的 worker 无需重复摘要
+            memory.set_fold_callback(lambda: _save_folded(session_id, session))
+
+    # 存储中的状态由别的 worker 写入过时才重建本地记忆
+    stored = SESSION_STORE.load(session_id)
+    if stored is not None and stored[1] != session.rev:
+        restore_memory(session.chain.memory, stored[0])
+        session.rev = stored[1]
+    elif stored is None and session.rev is not None:
+        session.chain.memory.clear()  # 存储中已过期
+        session.rev = None
+
+    response = session.chain.predict(input=user_input)
+    _save_session(session_id, session)
+    conversation_sessions.put(session_id, session)
     return response
 
-# --- 这部分是从旧代码保留的，用于文件处理完成后生成报告 ---
-def generate_standalone_report(analysis_result: dict) -> str:
-    """
-    专门用于在文件上传和分析成功后，生成最终的分析报告。
-    结合Python统计分析和LLM生成，提供深度洞察。
-    """
-    if "error" in analysis_result:
-        return f"### 分析失败\n\n抱歉，我在处理您的数据时遇到了一个问题：\n`{analysis_result['error']}`"
-
-    if 'summary_stats' not in analysis_result:
-        return "### 分析失败\n\n数据分析工具未能返回有效的统计摘要信息。"
-
-    summary = analysis_result['summary_stats']
+def _save_session(session_id, session):
+    """导出会话记忆并写入存储，同时记下新的 rev。"""
+    rev = new_rev()
+    SESSION_STORE.save(session_id, memory_state(session.chain.memory), rev)
+    session.rev = rev
 
-    # 从 summary 中提取原始数据进行统计分析
-    insights = {}
-    if 'historical_y' in summary:
-        insights = analyze_data_insights(summary['historical_y'])
+def _save_folded(session_id, session):
+    """摘要完成后写回；若期间别的 worker 已推进该会话则放弃，避免覆盖新状态。"""
+    stored = SESSION_STORE.load(session_id)
+    if stored is not None and stored[1] == session.rev:
+        _save_session(session_id, session)
 
-    trend = insights.get('trend', '未知')
-    volatility = insights.get('volatility', '中')
-    anomaly_count = insights.get('anomaly_count', 0)
-    pred_mean = summary.get('forecast_y_mean', summary.get('historical_y_mean', 'N/A'))
-    hist_mean = summary.get('historical_y_mean', 'N/A')
+def _new_memory():
+    """按 CHAT_MEMORY 创建会话记忆。"""
+    if CHAT_MEMORY == "buffer":
+        return ConversationBufferMemory(return_messages=True)
+    return RollingSummaryMemory(llm=llm)
 
-    model_rec = "ScatterFusion（鲁棒性强）" if volatility == '高' else \
-                "AWGFormer（多尺度分析）" if insights.get('has_seasonality') else \
-                "EnergyPatchTST（不确定性量化）"
-
-    report_prompt_template = """你是"鼠先知"平台的AI数据分析师。请基于以下分析结果，生成一份专业的数据洞察报告。
+# --- 报告与智能预测的提示词模板 ---
+REPORT_TEMPLATE = """你是"鼠先知"平台的AI数据分析师。请基于以下分析结果，生成一份专业的数据洞察报告。
 
 分析数据：
 - 数据规模：{hist_points}个历史观测点，预测未来{forecast_steps}步
@@ -203,14 +209,72 @@ def generate_standalone_report(analysis_result: dict) -> str:
 
 基于波动性和异常点情况给出风险提示和建议。"""
 
-    REPORT_PROMPT = PromptTemplate(
-        template=report_prompt_template,
-        input_variables=["hist_points", "forecast_steps", "hist_mean", "pred_mean",
-                         "trend", "volatility", "anomaly_count", "model_rec"]
-    )
-    report_chain = LLMChain(llm=llm, prompt=REPORT_PROMPT)
+REPORT_PROMPT = PromptTemplate(
+    template=REPORT_TEMPLATE,
+    input_variables=["hist_points", "forecast_steps", "hist_mean", "pred_mean",
+                     "trend", "volatility", "anomaly_count", "model_rec"]
+)
+
+COTP_PROMPT = PromptTemplate(
+    template=(
+        "作为时序分析专家，基于数据特征和近期观测预测未来{steps}步。\n"
+        "特征：趋势={trend}, 波动={volatility}(std={std}), "
+        "均值={mean}, 周期性={seas}\n"
+        "近期数据：{recent}\n"
+        "仅输出JSON：{{\"predictions\": [v1,v2,...], \"confidence\": 0到1}}"
+    ),
+    input_variables=["steps", "trend", "volatility", "std", "mean", "seas", "recent"]
+)
+
+RC_PROMPT = PromptTemplate(
+    template=(
+        "你是时序预测审核专家。审查以下预测并修正不合理之处。\n"
+        "特征：趋势={trend}, 波动={volatility}, 均值={mean}, std={std}\n"
+        "尾部5点：{tail}\n初始预测：{preds}\n"
+        "审查：1)是否延续趋势 2)幅度是否合理 3)有无突变\n"
+        "仅输出JSON：{{\"predictions\": [v1,v2,...]}}"
+    ),
+    input_variables=["trend", "volatility", "mean", "std", "tail", "preds"]
+)
+
+# 预编译的链注册表：进程内只构建一次，各请求复用（共享连接池的 llm，关闭 verbose）
+# 只有这些报告/预测链走响应缓存；对话回复与记忆摘要不缓存，避免跨会话串话
+CHAINS = {
+    "report": CachedLLMChain(llm=llm, prompt=REPORT_PROMPT, verbose=False),
+    "cotp": CachedLLMChain(llm=llm, prompt=COTP_PROMPT, verbose=False),
+    "rc": CachedLLMChain(llm=llm, prompt=RC_PROMPT, verbose=False),
+}
+
+# --- 这部分是从旧代码保留的，用于文件处理完成后生成报告 ---
+def generate_standalone_report(analysis_result: dict) -> str:
+    """
+    专门用于在文件上传和分析成功后，生成最终的分析报告。
+    结合Python统计分析和LLM生成，提供深度洞察。
+    """
+    if "error" in analysis_result:
+        return f"### 分析失败\n\n抱歉，我在处理您的数据时遇到了一个问题：\n`{analysis_result['error']}`"
+
+    if 'summary_stats' not in analysis_result:
+        return "### 分析失败\n\n数据分析工具未能返回有效的统计摘要信息。"
 
-    response = report_chain.invoke({
+    summary = analysis_result['summary_stats']
+
+    # 从 summary 中提取原始数据进行统计分析
+    insights = {}
+    if 'historical_y' in summary:
+        insights = analyze_data_insights(summary['historical_y'])
+
+    trend = insights.get('trend', '未知')
+    volatility = insights.get('volatility', '中')
+    anomaly_count = insights.get('anomaly_count', 0)
+    pred_mean = summary.get('forecast_y_mean', summary.get('historical_y_mean', 'N/A'))
+    hist_mean = summary.get('historical_y_mean', 'N/A')
+
+    model_rec = "ScatterFusion（鲁棒性强）" if volatility == '高' else \
+                "AWGFormer（多尺度分析）" if insights.get('has_seasonality') else \
+                "EnergyPatchTST（不确定性量化）"
+
+    response = CHAINS["report"].invoke({
         "hist_points": summary.get('historical_points', 'N/A'),
         "forecast_steps": summary.get('forecast_steps', 'N/A'),
         "hist_mean": hist_mean,
@@ -226,75 +290,78 @@ def generate_standalone_report(analysis_result: dict) -> str:
 # === 鼠先知智能预测引擎 ===
 # 四阶段 Agent 协作框架：FAP → CoTP → RC → SV
 
-def smart_predict(data_y: list, steps: int = 10) -> dict:
+# 异步模式：LLM 阶段在线程池中执行，每阶段有硬性截止时间（秒）
+SMART_ASYNC = os.getenv("SMART_PREDICT_ASYNC", "1").lower() in ("1", "true", "yes")
+COTP_DEADLINE = float(os.getenv("SMART_COTP_DEADLINE", "20"))
+RC_DEADLINE = float(os.getenv("SMART_RC_DEADLINE", "15"))
+SMART_LLM_THREADS = int(os.getenv("SMART_LLM_THREADS", "8"))
+_llm_pool = ThreadPoolExecutor(max_workers=SMART_LLM_THREADS, thread_name_prefix="smart-llm")
+# 空闲线程数：超时的调用仍占用线程，直到真正返回才释放
+_llm_slots = threading.BoundedSemaphore(SMART_LLM_THREADS)
+
+def smart_predict(data_y: list, steps: int = 10, async_llm: bool = None) -> dict:
     """
     鼠先知智能预测引擎
     Phase 1 - Feature-Aware Profiling (FAP): 零token统计特征提取
     Phase 2 - Chain-of-Thought Prediction (CoTP): 特征引导链式推理
     Phase 3 - Reflective Critique (RC): 自反思校验与预测修正
     Phase 4 - Statistical Validation (SV): 置信度校准与异常修正
+
+    async_llm（默认取 SMART_PREDICT_ASYNC）：CoTP/RC 在线程池中执行，统计降级预测
+    与 CoTP 并行计算；CoTP 超过 SMART_COTP_DEADLINE 秒改用降级预测，RC 超过
+    SMART_RC_DEADLINE 秒则保留 CoTP 结果（均从调用开始执行时计时）。线程池
+    SMART_LLM_THREADS 个线程全忙时不排队，该阶段直接按超时处理。
     """
-    # === Phase 1: FAP ===
+    if async_llm is None:
+        async_llm = SMART_ASYNC
+
+    # 同一数据 + 步长 + 模型的重复请求直接返回缓存结果（TTL + LRU）
+    cache_key = ("smart", fingerprint(data_y), steps, getattr(llm, "model_name", ""))
+    hit = RESULT_CACHE.get(cache_key)
+    if hit is not None:
+        return copy.deepcopy(hit)
+
+    # === Phase 1: FAP === （与步长无关，按序列指纹缓存）
     insights = analyze_data_insights(data_y)
     context_len = min(30, len(data_y))
     recent = data_y[-context_len:]
 
     # === Phase 2: CoTP ===
-    prompt = PromptTemplate(
-        template=(
-            "作为时序分析专家，基于数据特征和近期观测预测未来{steps}步。\n"
-            "特征：趋势={trend}, 波动={volatility}(std={std}), "
-            "均值={mean}, 周期性={seas}\n"
-            "近期数据：{recent}\n"
-            "仅输出JSON：{{\"predictions\": [v1,v2,...], \"confidence\": 0到1}}"
-        ),
-        input_variables=["steps", "trend", "volatility", "std", "mean", "seas", "recent"]
-    )
-
-    try:
-        raw = LLMChain(llm=llm, prompt=prompt).invoke({
-            "steps": steps, "trend": insights["trend"],
-            "volatility": insights["volatility"], "std": insights["std"],
-            "mean": insights["mean"],
-            "seas": "有" if insights["has_seasonality"] else "无",
-            "recent": str(recent)
-        })
-        json_match = re.search(r'\{.*\}', raw["text"], re.DOTALL)
-        parsed = json.loads(json_match.group())
-        predictions = [float(x) for x in parsed["predictions"][:steps]]
-        confidence = float(parsed.get("confidence", 0.5))
-    except Exception:
+    if async_llm:
+        cotp_future = _submit_llm(_cotp_phase, insights, recent, steps)
+        try:
+            fallback = _linear_fallback(data_y, steps)  # 与 LLM 调用并行
+        except Exception:
+            fallback = None
+        cotp, _ = _result_within(cotp_future, COTP_DEADLINE)
+    else:
+        try:
+            cotp = _cotp_phase(insights, recent, steps)
+        except Exception:
+            cotp = None
+        fallback = None
+
+    llm_ok = cotp is not None
+    if llm_ok:
+        predictions, confidence = cotp
+    else:
         # Fallback: 线性外推
-        x = np.arange(len(data_y))
-        slope, intercept = np.polyfit(x, data_y, 1)
-        predictions = [float(slope * (len(data_y) + i) + intercept) for i in range(steps)]
+        predictions = fallback or _linear_fallback(data_y, steps)
         confidence = 0.3
 
     # === Phase 3: RC (Reflective Critique) ===
-    try:
-        rc_prompt = PromptTemplate(
-            template=(
-                "你是时序预测审核专家。审查以下预测并修正不合理之处。\n"
-                "特征：趋势={trend}, 波动={volatility}, 均值={mean}, std={std}\n"
-                "尾部5点：{tail}\n初始预测：{preds}\n"
-                "审查：1)是否延续趋势 2)幅度是否合理 3)有无突变\n"
-                "仅输出JSON：{{\"predictions\": [v1,v2,...]}}"
-            ),
-            input_variables=["trend", "volatility", "mean", "std", "tail", "preds"]
-        )
-        rc_raw = LLMChain(llm=llm, prompt=rc_prompt).invoke({
-            "trend": insights["trend"], "volatility": insights["volatility"],
-            "mean": insights["mean"], "std": insights["std"],
-            "tail": str(data_y[-5:]), "preds": str(predictions)
-        })
-        rc_match = re.search(r'\{.*\}', rc_raw["text"], re.DOTALL)
-        rc_parsed = json.loads(rc_match.group())
-        refined = [float(v) for v in rc_parsed["predictions"][:steps]]
-        if len(refined) == len(predictions):
-            predictions = refined
-            confidence = min(confidence + 0.05, 1.0)
-    except Exception:
-        pass  # RC失败保留原始预测
+    rc_degraded = False
+    if async_llm:
+        rc_future = _submit_llm(_rc_phase, insights, data_y, predictions, steps)
+        refined, rc_degraded = _result_within(rc_future, RC_DEADLINE)
+    else:
+        try:
+            refined = _rc_phase(insights, data_y, predictions, steps)
+        except Exception:
+            refined = None  # RC失败保留原始预测
+    if refined is not None and len(refined) == len(predictions):
+        predictions = refined
+        confidence = min(confidence + 0.05, 1.0)
 
     # === Phase 4: SV ===
     mean_val, std_val = insights["mean"], insights["std"]
@@ -310,10 +377,93 @@ def smart_predict(data_y: list, steps: int = 10) -> dict:
     while len(validated) < steps:
         validated.append(validated[-1] if validated else round(mean_val, 4))
 
-    return {
+    result = {
         "engine": "鼠先知智能预测引擎",
         "predictions": validated,
         "confidence": round(min(confidence, 1.0), 2),
         "data_profile": insights,
         "steps": steps
-    }
\ No newline at end of file
+    }
+    # LLM 失败或超时的降级结果不缓存，下次请求可重试
+    if llm_ok and not rc_degraded:
+        RESULT_CACHE.put(cache_key, copy.deepcopy(result), approx_nbytes(result))
+    return result
+
+
+def _cotp_phase(insights: dict, recent: list, steps: int) -> tuple:
+    """CoTP：特征引导的链式推理预测，返回 (predictions, confidence)。"""
+    raw = CHAINS["cotp"].invoke({
+        "steps": steps, "trend": insights["trend"],
+        "volatility": insights["volatility"], "std": insights["std"],
+        "mean": insights["mean"],
+        "seas": "有" if insights["has_seasonality"] else "无",
+        "recent": str(recent)
+    })
+    json_match = re.search(r'\{.*\}', raw["text"], re.DOTALL)
+    parsed = json.loads(json_match.group())
+    predictions = [float(x) for x in parsed["predictions"][:steps]]
+    return predictions, float(parsed.get("confidence", 0.5))
+
+
+def _rc_phase(insights: dict, data_y: list, predictions: list, steps: int) -> list:
+    """RC：自反思审查初始预测，返回修正后的预测。"""
+    rc_raw = CHAINS["rc"].invoke({
+        "trend": insights["trend"], "volatility": insights["volatility"],
+        "mean": insights["mean"], "std": insights["std"],
+        "tail": str(data_y[-5:]), "preds": str(predictions)
+    })
+    rc_match = re.search(r'\{.*\}', rc_raw["text"], re.DOTALL)
+    rc_parsed = json.loads(rc_match.group())
+    return [float(v) for v in rc_parsed["predictions"][:steps]]
+
+
+def _linear_fallback(data_y: list, steps: int) -> list:
+    """统计降级预测：线性外推。"""
+    x = np.arange(len(data_y))
+    slope, intercept = np.polyfit(x, data_y, 1)
+    return [float(slope * (len(data_y) + i) + intercept) for i in range(steps)]
+
+
+def _submit_llm(fn, *args):
+    """把 LLM 阶段提交到线程池；没有空闲线程时返回 None，不排队。
+
+    返回的 future 带 ``started`` 事件，调用开始执行时置位。
+    """
+    if not _llm_slots.acquire(blocking=False):
+        return None
+    started = threading.Event()
+
+    def run():
+        started.set()
+        try:
+            return fn(*args)
+        finally:
+            _llm_slots.release()
+
+    try:
+        future = _llm_pool.submit(run)
+    except RuntimeError:
+        _llm_slots.release()
+        return None
+    future.started = started
+    return future
+
+
+def _result_within(future, deadline: float) -> tuple:
+    """在截止时间内取回 LLM 阶段结果，返回 (result, degraded)。
+
+    截止时间从调用开始执行时计起。超时、线程全忙（``future`` 为 None）
+    时 result 为 None 且 degraded 为 True；超时的调用在后台结束，不再等待。
+    调用本身失败时返回 (None, False)。
+    """
+    if future is None:
+        return None, True
+    if not future.started.wait(deadline):
+        future.cancel()
+        return None, True
+    try:
+        return future.result(timeout=deadline), False
+    except FutureTimeout:
+        return None, True
+    except Exception:
+        return None, False
@@ -0,0 +1,140 @@
+# backend/models/chat_memory.py
+"""
+对话记忆 — 最近 N 轮原文 + 后台滚动摘要，控制每轮发送的 token 数
+"""
+
+import contextlib
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain.memory import ConversationSummaryBufferMemory
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.pydantic_v1 import PrivateAttr
+
+CHAT_KEEP_TURNS = int(os.getenv("CHAT_KEEP_TURNS", "6"))
+CHAT_TOKEN_BUDGET = int(os.getenv("CHAT_TOKEN_BUDGET", "1500"))
+
+_CJK = re.compile(r"[\u3000-\u303f\u4e00-\u9fff\uff00-\uffef]")
+_summary_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="chat-summary")
+_NO_LOCK = contextlib.nullcontext()
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：中文约 1 字 1 token，其余约 4 字符 1 token（无需分词器）。"""
+    cjk = len(_CJK.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def memory_state(memory) -> dict:
+    """导出记忆状态为紧凑的可 JSON 化结构：滚动摘要 + [角色, 内容] 列表。"""
+    lock = getattr(memory, "_lock", None)
+    with lock or _NO_LOCK:
+        messages = list(memory.chat_memory.messages)
+        summary = getattr(memory, "moving_summary_buffer", "")
+    return {
+        "summary": summary,
+        "messages": [["h" if m.type == "human" else "a", m.content] for m in messages],
+    }
+
+
+def restore_memory(memory, state: dict) -> None:
+    """用 memory_state 导出的状态覆盖记忆内容。"""
+    messages = [HumanMessage(content=c) if t == "h" else AIMessage(content=c)
+                for t, c in state.get("messages", [])]
+    if isinstance(memory, RollingSummaryMemory):
+        memory.restore(messages, state.get("summary", ""))
+    else:
+        memory.chat_memory.messages = messages
+
+
+class RollingSummaryMemory(ConversationSummaryBufferMemory):
+    """保留最近 keep_turns 轮原文；更早的轮次在后台线程折叠进滚动摘要。
+
+    超出轮数或 token 预算的最早几轮交给摘要线程处理，不阻塞当前请求；
+    摘要完成前这些轮次仍留在缓冲区中。摘要失败时也会丢弃它们，
+    以保证缓冲区有界。
+    """
+
+    keep_turns: int = CHAT_KEEP_TURNS
+    max_token_limit: int = CHAT_TOKEN_BUDGET
+    return_messages: bool = True
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _folding: bool = PrivateAttr(default=False)
+    _generation: int = PrivateAttr(default=0)
+    _on_fold = PrivateAttr(default=None)
+
+    def set_fold_callback(self, callback) -> None:
+        """摘要折叠完成后调用 ``callback()``，用于把新状态写回会话存储。"""
+        self._on_fold = callback
+
+    def restore(self, messages, summary: str) -> None:
+        """替换缓冲区与摘要；进行中的折叠结果作废。"""
+        with self._lock:
+            self.chat_memory.messages = list(messages)
+            self.moving_summary_buffer = summary
+            self._generation += 1
+            self._folding = False
+        self.prune()
+
+    def load_memory_variables(self, inputs):
+        with self._lock:
+            return super().load_memory_variables(inputs)
+
+    def save_context(self, inputs, outputs) -> None:
+        with self._lock:
+            super(ConversationSummaryBufferMemory, self).save_context(inputs, outputs)
+        self.prune()
+
+    def prune(self) -> None:
+        """把超出预算的最早轮次提交给后台摘要（同一时间只有一个摘要任务）。"""
+        with self._lock:
+            if self._folding:
+                return
+            messages = self.chat_memory.messages
+            n_fold = self._overflow(messages)
+            if n_fold == 0:
+                return
+            self._folding = True
+            to_fold = list(messages[:n_fold])
+            summary = self.moving_summary_buffer
+            generation = self._generation
+        _summary_pool.submit(self._fold, to_fold, summary, generation)
+
+    def clear(self) -> None:
+        with self._lock:
+            super().clear()
+            self._generation += 1
+            self._folding = False
+
+    def _overflow(self, messages) -> int:
+        # 按整轮（用户 + 助手两条）折叠，至少保留最近一轮
+        keep = max(1, self.keep_turns) * 2
+        n_fold = max(0, len(messages) - keep)
+        tokens = sum(estimate_tokens(m.content) for m in messages[n_fold:])
+        while tokens > self.max_token_limit and len(messages) - n_fold > 2:
+            tokens -= sum(estimate_tokens(m.content) for m in messages[n_fold:n_fold + 2])
+            n_fold += 2
+        return n_fold - n_fold % 2
+
+    def _fold(self, to_fold, summary, generation):
+        try:
+            new_summary = self.predict_new_summary(to_fold, summary)
+        except Exception:
+            new_summary = None
+        with self._lock:
+            if generation != self._generation:
+                return  # 摘要期间记忆已被 restore 覆盖
+            if new_summary is not None:
+                self.moving_summary_buffer = new_summary
+            # 只有追加写入，待折叠的消息仍位于缓冲区开头
+            del self.chat_memory.messages[:len(to_fold)]
+            self._folding = False
+        if self._on_fold is not None:
+            try:
+                self._on_fold()
+            except Exception:
+                pass
+        self.prune()  # 摘要期间可能又积累了超额轮次
@@ -85,3 +85,11 @@ class CreditLog(db.Model):
     type = db.Column(db.String(20), nullable=False)
     description = db.Column(db.String(200), default='')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class ConversationSession(db.Model):
+    __tablename__ = 'conversation_session'
+    session_id = db.Column(db.String(128), primary_key=True)
+    state = db.Column(db.Text, nullable=False)
+    rev = db.Column(db.String(32), nullable=False)
+    updated_at = db.Column(db.Float, nullable=False, index=True)
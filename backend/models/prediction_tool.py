@@ -1,8 +1,8 @@
 # backend/models/prediction_tool.py
 
 import pandas as pd
-from statsmodels.tsa.arima.model import ARIMA
 import warnings
+from agent.tools.forecasters import fit_arima
 
 warnings.filterwarnings("ignore")
 
@@ -56,10 +56,12 @@ def analyze_and_predict(csv_path: str, steps: int = 10) -> dict:
         if len(history_y) < 10:
             return {"error": f"有效数据点过少 ({len(history_y)}个)，无法进行有效的ARIMA模型分析。请提供至少10个有效的数据点。"}
 
-        model = ARIMA(history_y, order=(5, 1, 0))
-        model_fit = model.fit()
-        
-        forecast_y = model_fit.forecast(steps=steps).tolist()
+        # 与集成预测共享拟合缓存：网格中同样包含 ARIMA(5,1,0)
+        fit = fit_arima(history_y, (5, 1, 0), steps)
+        if fit is None:
+            raise RuntimeError("ARIMA(5,1,0) 模型拟合失败")
+
+        forecast_y = fit[1].tolist()
         
         last_x = history_x[-1]
         x_step = history_x[-1] - history_x[-2] if len(history_x) > 1 else 1
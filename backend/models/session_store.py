@@ -0,0 +1,320 @@
+# backend/models/session_store.py
+"""
+对话会话存储 — 让多个 gunicorn worker 共享同一会话的记忆状态
+
+Each turn loads the session's memory state from the store and saves it back
+afterwards, so consecutive messages of one chat may land on any worker. The
+state is a compact JSON document (rolling summary plus ``[role, content]``
+pairs) tagged with a ``rev`` token; a worker only rebuilds its local memory
+when the stored ``rev`` differs from the one it last saw.
+
+``CHAT_SESSION_STORE`` picks the backend:
+
+    ``memory``  process-local (default; one worker only)
+    ``db``      the ``conversation_session`` table on the app database
+    ``file``    one file per session under ``CHAT_SESSION_DIR``
+
+The shared backends write behind: saves are coalesced per session and
+flushed every ``CHAT_STORE_FLUSH`` seconds by a background thread, one row
+per write so a bad row can't hold back the others. A row that keeps
+failing is dropped after ``CHAT_STORE_RETRIES`` attempts. A worker always
+reads its own unflushed writes.
+
+Session ids come from the client, so callers key the store with
+:func:`session_key`, which scopes them to the user and hashes them to a
+fixed length.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+
+from agent.cache import LRUCache
+
+CHAT_SESSION_STORE = os.getenv("CHAT_SESSION_STORE", "memory").lower()
+CHAT_SESSION_DIR = os.getenv("CHAT_SESSION_DIR", "chat_sessions")
+CHAT_STORE_FLUSH = float(os.getenv("CHAT_STORE_FLUSH", "0.2"))  # 批量写入间隔（秒）
+CHAT_SESSION_TTL = float(os.getenv("CHAT_SESSION_TTL", "1800"))  # 空闲超时（秒）
+CHAT_MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", "1000"))
+CHAT_STORE_RETRIES = int(os.getenv("CHAT_STORE_RETRIES", "3"))  # 单条写入最多尝试次数
+
+_PURGE_INTERVAL = 60.0
+
+logger = logging.getLogger(__name__)
+
+
+def new_rev() -> str:
+    return uuid.uuid4().hex
+
+
+def session_key(user_id, session_id: str) -> str:
+    """按用户隔离并哈希客户端传来的会话 id，得到定长的存储键。"""
+    digest = hashlib.blake2b(str(session_id).encode("utf-8"), digest_size=16).hexdigest()
+    return f"{user_id}:{digest}"
+
+
+class SessionStore(ABC):
+    """会话状态存储接口：``load`` 返回 ``(state, rev)`` 或 None。"""
+
+    ttl = CHAT_SESSION_TTL
+
+    @abstractmethod
+    def load(self, session_id: str):
+        """读取会话状态，不存在或已过期时返回 None。"""
+
+    @abstractmethod
+    def save(self, session_id: str, state: dict, rev: str) -> None:
+        """写入会话状态及其 rev。"""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """删除会话。"""
+
+    def flush(self) -> None:
+        """把未落盘的写入立即写出（默认无缓冲）。"""
+
+    def init_app(self, app) -> None:
+        """绑定 Flask 应用（仅数据库存储需要）。"""
+
+
+class MemorySessionStore(SessionStore):
+    """进程内存储，等同于原来的单进程会话缓存。"""
+
+    def __init__(self, max_entries: int = CHAT_MAX_SESSIONS, ttl: float = CHAT_SESSION_TTL):
+        self.ttl = ttl
+        self._cache = LRUCache(max_entries=max_entries, max_bytes=1 << 62, ttl=ttl)
+
+    def load(self, session_id):
+        self._cache.purge_expired()
+        return self._cache.get(session_id)
+
+    def save(self, session_id, state, rev):
+        self._cache.put(session_id, (state, rev))
+
+    def delete(self, session_id):
+        self._cache.put(session_id, None)
+
+
+class _WriteBehindStore(SessionStore):
+    """按会话合并写入、由后台线程批量刷出的共享存储基类。"""
+
+    def __init__(self, ttl: float = CHAT_SESSION_TTL, flush_interval: float = CHAT_STORE_FLUSH):
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self._pending = {}  # session_id -> (payload | None, rev, updated_at)
+        self._failures = {}  # session_id -> 连续写入失败次数
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flusher_pid = None
+        self._last_purge = 0.0
+        atexit.register(self.flush)
+
+    def load(self, session_id):
+        with self._lock:
+            pending = self._pending.get(session_id)
+        if pending is not None:
+            payload, rev, _ = pending
+            return None if payload is None else (json.loads(payload), rev)
+        try:
+            row = self._read(session_id)
+        except Exception:
+            return None
+        if row is None:
+            return None
+        payload, rev, updated_at = row
+        if self.ttl and time.time() - updated_at > self.ttl:
+            return None
+        return json.loads(payload), rev
+
+    def save(self, session_id, state, rev):
+        payload = json.dumps(state, ensure_ascii=False, separators=(",", ":"))
+        self._enqueue(session_id, payload, rev)
+
+    def delete(self, session_id):
+        self._enqueue(session_id, None, None)
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            for session_id, item in batch.items():
+                try:
+                    self._write_row(session_id, *item)
+                except Exception:
+                    self._retry_later(session_id, item)
+                else:
+                    self._failures.pop(session_id, None)
+            now = time.time()
+            if self.ttl and now - self._last_purge > _PURGE_INTERVAL:
+                self._last_purge = now
+                try:
+                    self._purge(now - self.ttl)
+                except Exception:
+                    pass
+
+    def _retry_later(self, session_id, item):
+        attempts = self._failures.get(session_id, 0) + 1
+        if attempts >= CHAT_STORE_RETRIES:
+            self._failures.pop(session_id, None)
+            logger.exception("dropping chat session %s after %d failed writes",
+                             session_id, attempts)
+            return
+        self._failures[session_id] = attempts
+        with self._lock:
+            # 期间已有更新的写入则以新值为准
+            self._pending.setdefault(session_id, item)
+
+    def _enqueue(self, session_id, payload, rev):
+        with self._lock:
+            self._pending[session_id] = (payload, rev, time.time())
+        self._ensure_flusher()
+        self._wake.set()
+
+    def _ensure_flusher(self):
+        # 按进程启动：gunicorn --preload 在 fork 前导入本模块，线程不会被继承
+        pid = os.getpid()
+        if self._flusher_pid == pid:
+            return
+        with self._lock:
+            if self._flusher_pid == pid:
+                return
+            self._flusher_pid = pid
+            self._wake = threading.Event()
+        threading.Thread(target=self._run_flusher, name="chat-session-flush",
+                         daemon=True).start()
+
+    def _run_flusher(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.flush_interval)  # 聚合这段时间内的写入
+            self._wake.clear()
+            self.flush()
+
+    @abstractmethod
+    def _read(self, session_id):
+        """返回 ``(payload, rev, updated_at)`` 或 None。"""
+
+    @abstractmethod
+    def _write_row(self, session_id, payload, rev, updated_at) -> None:
+        """写入一条会话；``payload`` 为 None 表示删除。"""
+
+    @abstractmethod
+    def _purge(self, cutoff: float) -> None:
+        """删除 ``updated_at`` 早于 ``cutoff`` 的会话。"""
+
+
+class DBSessionStore(_WriteBehindStore):
+    """存于应用数据库 ``conversation_session`` 表（SQLite / PostgreSQL 均可）。"""
+
+    def __init__(self, app=None, **kwargs):
+        super().__init__(**kwargs)
+        from models.db_models import ConversationSession
+        self._table = ConversationSession.__table__
+        self._engine = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        from extensions import db
+        with app.app_context():
+            self._engine = db.engine
+
+    def _read(self, session_id):
+        if self._engine is None:
+            return None
+        t = self._table
+        with self._engine.connect() as conn:
+            row = conn.execute(
+                t.select().with_only_columns(t.c.state, t.c.rev, t.c.updated_at)
+                .where(t.c.session_id == session_id)
+            ).first()
+        return None if row is None else tuple(row)
+
+    def _write_row(self, session_id, payload, rev, updated_at):
+        if self._engine is None:
+            return  # 尚未绑定应用，丢弃
+        t = self._table
+        with self._engine.begin() as conn:
+            if payload is None:
+                conn.execute(t.delete().where(t.c.session_id == session_id))
+                return
+            values = {"state": payload, "rev": rev, "updated_at": updated_at}
+            updated = conn.execute(
+                t.update().where(t.c.session_id == session_id).values(**values))
+            if updated.rowcount == 0:
+                conn.execute(t.insert().values(session_id=session_id, **values))
+
+    def _purge(self, cutoff):
+        if self._engine is None:
+            return
+        t = self._table
+        with self._engine.begin() as conn:
+            conn.execute(t.delete().where(t.c.updated_at < cutoff))
+
+
+class FileSessionStore(_WriteBehindStore):
+    """每个会话一个文件（首行 rev，其后为状态 JSON），供同一主机上的 worker 共享。"""
+
+    def __init__(self, directory: str = CHAT_SESSION_DIR, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, session_id):
+        name = hashlib.blake2b(str(session_id).encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(self.directory, name + ".json")
+
+    def _read(self, session_id):
+        path = self._path(session_id)
+        try:
+            with open(path, encoding="utf-8") as f:
+                rev, _, payload = f.read().partition("\n")
+            updated_at = os.path.getmtime(path)
+        except OSError:
+            return None
+        return (payload, rev, updated_at) if payload else None
+
+    def _write_row(self, session_id, payload, rev, updated_at):
+        path = self._path(session_id)
+        if payload is None:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return
+        # 先写临时文件再原子替换，读方不会看到半个文件
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(rev + "\n" + payload)
+        os.replace(tmp, path)
+        os.utime(path, (updated_at, updated_at))
+
+    def _purge(self, cutoff):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json") and entry.stat().st_mtime < cutoff:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+
+SESSION_STORES = {
+    "memory": MemorySessionStore,
+    "db": DBSessionStore,
+    "file": FileSessionStore,
+}
+
+
+def make_session_store(kind: str = CHAT_SESSION_STORE) -> SessionStore:
+    """按名称创建会话存储；未知名称回退到内存存储。"""
+    return SESSION_STORES.get(kind, MemorySessionStore)()
+
+
+SESSION_STORE = make_session_store()
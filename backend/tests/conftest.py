@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 模块导入时会构建 LLM 客户端，测试中只需一个占位 key（不会发起真实请求）
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("DATABASE_URL", "sqlite://")  # 内存数据库，不落盘
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
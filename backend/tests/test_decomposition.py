@@ -0,0 +1,36 @@
+import numpy as np
+
+import agent.tools.decomposition as decomposition
+
+
+def _seasonal(n):
+    t = np.arange(n)
+    return (3 * np.sin(2 * np.pi * t / 12) + np.random.default_rng(2).normal(size=n)).tolist()
+
+
+def test_stl_falls_back_to_classical_above_cap(monkeypatch):
+    y = _seasonal(240)
+    assert decomposition.seasonal_decompose(y, period=12, method="stl")["method"] == "stl"
+    monkeypatch.setattr(decomposition, "STL_MAX_POINTS", 200)
+    capped = decomposition.seasonal_decompose(y, period=12, method="stl")
+    assert capped == decomposition.seasonal_decompose(y, period=12)
+
+
+def test_difference_transform_runs_no_unit_root_test_by_default(monkeypatch):
+    y = np.cumsum(np.random.default_rng(4).normal(size=500)).tolist()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("unexpected ADF test")
+
+    monkeypatch.setattr(decomposition, "adf_test", fail)
+    monkeypatch.setattr(decomposition, "ndiffs", fail)
+    result = decomposition.difference_transform(y)
+    assert set(result) == {"tool", "order", "original_mean", "differenced_mean",
+                           "differenced_std", "variance_reduction"}
+
+
+def test_difference_transform_unit_root_keys_on_request():
+    y = np.cumsum(np.random.default_rng(4).normal(size=500)).tolist()
+    result = decomposition.difference_transform(y, unit_root=True)
+    assert result["suggested_order"] == 1
+    assert result["differenced_adf_p_value"] < 0.05
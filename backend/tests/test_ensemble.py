@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+import agent.ensemble as ensemble
+from agent.tools.forecasters import MODEL_CACHE
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(0)
+    t = np.arange(120)
+    return (np.cumsum(rng.normal(size=120)) + 5 * np.sin(t / 4)).tolist()
+
+
+def test_concurrent_matches_sequential(series):
+    MODEL_CACHE.clear()
+    sequential = ensemble.ensemble_predict(series, 10)
+    MODEL_CACHE.clear()
+    concurrent = ensemble.ensemble_predict(series, 10, concurrent=True)
+    for field in ("predictions", "models_used", "cv_errors"):
+        assert concurrent[field] == sequential[field]
+
+
+def test_concurrent_fits_fill_parent_cache(series, monkeypatch):
+    MODEL_CACHE.clear()
+    first = ensemble.ensemble_predict(series, 10, concurrent=True)
+    assert any(key[0] == "arima" for key, _ in MODEL_CACHE.items())
+
+    # Everything is cached now, so nothing should reach the process pool
+    def no_pool():
+        raise AssertionError("process pool used for cached fits")
+
+    monkeypatch.setattr(ensemble, "get_process_pool", no_pool)
+    second = ensemble.ensemble_predict(series, 10, concurrent=True)
+    assert second["predictions"] == first["predictions"]
+
+
+def test_lazy_matches_eager(series):
+    eager = ensemble.ensemble_predict(series, 10)
+    lazy = ensemble.ensemble_predict(series, 10, lazy=True)
+    for field in ("predictions", "models_used", "cv_errors", "cv_residuals",
+                  "ci_lower", "ci_upper"):
+        assert lazy[field] == eager[field]
+
+
+def test_arima_fans_out_per_order_with_fit_timeout(series, monkeypatch):
+    import agent.tools.forecasters as forecasters
+
+    shipped, fanned = [], []
+    real_run_bounded = ensemble.run_bounded
+    real_arima_run_bounded = forecasters.run_bounded
+
+    def record_jobs(pool, calls, **kwargs):
+        shipped.append(([args[0].__name__ for _, args, _ in calls], kwargs))
+        return real_run_bounded(pool, calls, **kwargs)
+
+    def record_fits(pool, calls, **kwargs):
+        fanned.append((len(calls), kwargs))
+        return real_arima_run_bounded(pool, calls, **kwargs)
+
+    monkeypatch.setattr(ensemble, "run_bounded", record_jobs)
+    monkeypatch.setattr(forecasters, "run_bounded", record_fits)
+    MODEL_CACHE.clear()
+    ensemble.ensemble_predict(series, 10, concurrent=True, lazy=True)
+
+    # ARIMA never travels as one job; its orders are spread over the pool
+    assert all("arima_forecast" not in names for names, _ in shipped)
+    assert fanned and all(n > 1 for n, _ in fanned)
+    assert all(kw["timeout"] == ensemble.FIT_TIMEOUT for _, kw in shipped)
+    assert all(kw["timeout"] == ensemble.FIT_TIMEOUT for _, kw in fanned)
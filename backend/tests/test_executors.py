@@ -0,0 +1,47 @@
+import time
+
+from agent.executors import get_process_pool, run_bounded
+
+
+def _sleep_pid(seconds):
+    import os
+    time.sleep(seconds)
+    return os.getpid(), time.monotonic()
+
+
+def _boom():
+    raise ValueError("fit failed")
+
+
+def test_pool_is_not_rebuilt_for_larger_requests():
+    pool = get_process_pool()
+    run_bounded(pool, [(_sleep_pid, (0.01,), {})], max_workers=1)
+    assert get_process_pool() is pool
+
+
+def test_run_bounded_throttles_and_keeps_order():
+    calls = [(_sleep_pid, (0.2,), {}) for _ in range(4)]
+    start = time.monotonic()
+    results = run_bounded(get_process_pool(), calls, max_workers=1)
+    # One at a time: the four calls finish in submission order, one after another
+    ends = [end for _, end in results]
+    assert ends == sorted(ends)
+    assert time.monotonic() - start >= 0.8
+
+
+def test_timeout_counts_from_start_not_submission():
+    # Each call takes 0.3 s; with one worker the last waits ~0.6 s in the queue
+    calls = [(_sleep_pid, (0.3,), {}) for _ in range(3)]
+    results = run_bounded(get_process_pool(), calls, max_workers=1, timeout=1.0)
+    assert all(r is not None for r in results)
+
+
+def test_timed_out_and_failed_calls_are_none():
+    calls = [(_sleep_pid, (2.0,), {}), (_boom, (), {}), (_sleep_pid, (0.0,), {})]
+    results = run_bounded(get_process_pool(), calls, max_workers=3, timeout=0.5)
+    assert results[0] is None and results[1] is None and results[2] is not None
+
+
+def test_pool_workers_are_not_forked_from_this_process():
+    method = get_process_pool()._mp_context.get_start_method()
+    assert method in ("forkserver", "spawn")
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from statsmodels.tsa.arima_process import arma_generate_sample
+
+import agent.tools.forecasters as forecasters
+
+
+def _series(kind, n=240):
+    rng = np.random.default_rng(7)
+    if kind == "random_walk":
+        return np.cumsum(rng.normal(size=n))
+    if kind == "ar2":
+        return arma_generate_sample([1, -0.5, 0.3], [1], n, distrvs=rng.normal)
+    if kind == "ma1":
+        return arma_generate_sample([1], [1, 0.6], n, distrvs=rng.normal)
+    if kind == "integrated_ar1":
+        rng = np.random.default_rng(3)
+        return np.cumsum(arma_generate_sample([1, -0.5], [1], n, distrvs=rng.normal))
+    raise ValueError(kind)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    forecasters.MODEL_CACHE.clear()
+    yield
+    forecasters.MODEL_CACHE.clear()
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("kind", ["random_walk", "ar2", "ma1", "integrated_ar1"])
+def test_screened_search_keeps_full_grid_best(kind):
+    y = _series(kind).tolist()
+    full = forecasters.arima_forecast(y, steps=5, parallel=False, screen_top_k=0,
+                                      orders=forecasters.ARIMA_SCREEN_ORDERS)
+    screened = forecasters.arima_forecast(y, steps=5, parallel=False, screen_top_k=3)
+    assert screened["model"] == full["model"]
+    assert screened["predictions"] == full["predictions"]
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_screen_ranks_within_each_d():
+    y = _series("random_walk")
+    kept = forecasters.screen_orders(y, forecasters.ARIMA_SCREEN_ORDERS, top_k=3)
+    assert sum(o[1] == 0 for o in kept) == 3
+    assert sum(o[1] == 1 for o in kept) == 3
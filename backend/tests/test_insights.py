@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from agent.cache import RESULT_CACHE
+from agent.tools.autocorr import lag_correlation
+from models.agent_chain import analyze_data_insights
+
+
+def _old_has_seasonality(y):
+    # The original Pearson check the ACF-based path must reproduce
+    y = np.asarray(y, dtype=float)
+    if len(y) <= 20:
+        return False
+    lag = min(12, len(y) // 4)
+    return abs(float(np.corrcoef(y[:-lag], y[lag:])[0, 1])) > 0.5
+
+
+def _series():
+    rng = np.random.default_rng(11)
+    out = []
+    for n in (15, 21, 30, 48, 100, 365, 2000):
+        t = np.arange(n)
+        out.append(rng.normal(size=n))
+        out.append(0.05 * t + rng.normal(size=n))                     # trending
+        out.append(np.sin(2 * np.pi * t / 12) + rng.normal(size=n))   # seasonal
+        for phi in np.linspace(0.9, 0.99, 10):                        # near the 0.5 threshold
+            e = rng.normal(size=n)
+            out.append(np.array([sum(phi ** k * e[i - k] for k in range(min(i + 1, 60)))
+                                 for i in range(n)]))
+    return out
+
+
+def test_lag_correlation_matches_corrcoef():
+    for y in _series():
+        for lag in (1, 5, min(12, len(y) // 4)):
+            if 0 < lag < len(y) - 1:
+                expected = np.corrcoef(y[:-lag], y[lag:])[0, 1]
+                assert lag_correlation(y, lag) == pytest.approx(expected, abs=1e-9)
+
+
+def test_seasonality_flag_matches_pearson_threshold():
+    series = _series()
+    flags = []
+    for y in series:
+        RESULT_CACHE.clear()
+        flags.append(analyze_data_insights(y.tolist())["has_seasonality"])
+    assert flags == [_old_has_seasonality(y) for y in series]
+    assert any(flags) and not all(flags)
+
+
+def test_constant_window_is_not_seasonal():
+    assert lag_correlation(np.r_[np.zeros(30), 1.0], 12) == pytest.approx(0.0)
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from agent.intervals import (
+    CONFORMAL_CACHE, bootstrap_interval, conformal_interval, gaussian_interval,
+    lookup_conformal_residuals, prediction_interval,
+)
+
+
+@pytest.fixture
+def series():
+    return np.cumsum(np.random.default_rng(5).normal(size=200)).tolist()
+
+
+def _loop_bootstrap(y, preds, n_boot=200, alpha=0.05):
+    # The per-sample loop the vectorized bootstrap replaced
+    std_r = float(np.std(np.diff(y)))
+    rng = np.random.RandomState(42)
+    boot = np.array([np.array(preds) + rng.normal(0, std_r, len(preds))
+                     for _ in range(n_boot)])
+    lo = np.percentile(boot, 100 * alpha / 2, axis=0)
+    hi = np.percentile(boot, 100 * (1 - alpha / 2), axis=0)
+    return [round(float(v), 4) for v in lo], [round(float(v), 4) for v in hi]
+
+
+def test_bootstrap_reproduces_the_sample_loop(series):
+    preds = np.linspace(series[-1], series[-1] + 2, 12).tolist()
+    assert bootstrap_interval(series, preds) == _loop_bootstrap(series, preds)
+
+
+def test_gaussian_is_the_bootstrap_limit(series):
+    preds = [0.0] * 5
+    lo, hi = gaussian_interval(series, preds)
+    boot_lo, boot_hi = bootstrap_interval(series, preds, n_boot=200000)
+    assert np.allclose(lo, boot_lo, atol=0.02) and np.allclose(hi, boot_hi, atol=0.02)
+
+
+def test_gaussian_h_widens_with_sqrt_horizon(series):
+    lo, hi = prediction_interval(series, [0.0] * 4, method="gaussian_h")
+    width = np.array(hi) - np.array(lo)
+    assert np.allclose(width / width[0], np.sqrt([1, 2, 3, 4]), atol=1e-3)
+
+
+def test_residual_bootstrap_stays_within_centered_differences(series):
+    d = np.diff(series)
+    d = d - d.mean()
+    lo, hi = bootstrap_interval(series, [0.0] * 6, resample="residual")
+    assert min(lo) >= d.min() - 1e-4 and max(hi) <= d.max() + 1e-4
+    assert bootstrap_interval(series, [0.0] * 6, resample="residual") == (lo, hi)
+
+
+def test_unknown_modes_raise(series):
+    with pytest.raises(ValueError):
+        prediction_interval(series, [0.0], method="nope")
+    with pytest.raises(ValueError):
+        bootstrap_interval(series, [0.0], resample="nope")
+
+
+def test_conformal_quantile_scales_with_horizon():
+    # Scores |r_h| / sqrt(h) are 1..9; at alpha=0.2 the ceil(10 * 0.8) = 8th is used
+    residuals = [s * np.sqrt(h) for h, s in enumerate(range(1, 10), start=1)]
+    lo, hi = conformal_interval([0.0] * 4, residuals, alpha=0.2)
+    assert np.allclose(hi, 8 * np.sqrt([1, 2, 3, 4]), atol=1e-4)
+    assert np.allclose(lo, -np.array(hi))
+    # Too few residuals for the coverage: the largest score is used
+    assert conformal_interval([0.0], [1.0, 2.0], alpha=0.05)[1] == [round(2.0 / np.sqrt(2), 4)]
+
+
+def test_conformal_residuals_are_cached_for_extensions(series):
+    CONFORMAL_CACHE.clear()
+    residuals = [0.5, -1.0, 1.5, -2.0, 0.3, 0.9, -0.4, 1.1, -0.7, 0.2]
+    first = prediction_interval(series, [0.0] * 3, method="conformal", residuals=residuals)
+    assert first == conformal_interval([0.0] * 3, residuals)
+    # A longer series sharing the prefix reuses the residuals without new ones
+    extended = series + [series[-1] + 1.0]
+    assert np.array_equal(lookup_conformal_residuals(extended), residuals)
+    assert prediction_interval(extended, [0.0] * 3, method="conformal") == first
+
+
+def test_conformal_falls_back_to_gaussian(series):
+    CONFORMAL_CACHE.clear()
+    fresh = (np.array(series) + 100).tolist()
+    assert prediction_interval(fresh, [0.0] * 3, method="conformal") == \
+        gaussian_interval(fresh, [0.0] * 3)
@@ -0,0 +1,43 @@
+from langchain_community.chat_models.fake import FakeListChatModel
+from langchain.prompts import PromptTemplate
+from langchain_core.globals import get_llm_cache
+
+import models.agent_chain as agent_chain
+from agent.llm_cache import CachedLLMChain, get_response_cache, normalize_prompt
+
+
+def _fake(n=10):
+    return FakeListChatModel(responses=[f"reply-{i}" for i in range(n)])
+
+
+def test_no_global_llm_cache_installed():
+    assert get_llm_cache() is None
+
+
+def test_cached_chain_reuses_response():
+    get_response_cache().clear()
+    prompt = PromptTemplate.from_template("均值 {mean}，给出预测")
+    chain = CachedLLMChain(llm=_fake(), prompt=prompt)
+    first = chain.invoke({"mean": "1.50"})["text"]
+    # 仅格式不同（尾随零、指数写法）的数值命中缓存，不再调用模型
+    second = chain.invoke({"mean": "1.5e0"})["text"]
+    assert first == second == "reply-0"
+
+
+def test_distinct_data_never_collide():
+    get_response_cache().clear()
+    prompt = PromptTemplate.from_template("均值 {mean}，给出预测")
+    chain = CachedLLMChain(llm=_fake(), prompt=prompt)
+    first = chain.invoke({"mean": 1.23456789})["text"]
+    second = chain.invoke({"mean": 1.23456711})["text"]
+    assert (first, second) == ("reply-0", "reply-1")
+    assert normalize_prompt("x=0.12345678901234567") != normalize_prompt("x=0.1234567890123457")
+
+
+def test_chat_replies_are_not_cached(monkeypatch):
+    monkeypatch.setattr(agent_chain, "llm", _fake())
+    monkeypatch.setattr(agent_chain, "CHAT_MEMORY", "buffer")
+    agent_chain.conversation_sessions.clear()
+    a = agent_chain.get_conversational_response("你好，介绍一下ARIMA", "session-a")
+    b = agent_chain.get_conversational_response("你好，介绍一下ARIMA", "session-b")
+    assert (a, b) == ("reply-0", "reply-1")
@@ -0,0 +1,55 @@
+"""The optional fast paths, switched on through their module defaults."""
+import numpy as np
+import pytest
+
+import agent.ensemble as ensemble
+import agent.reasoner as reasoner
+import agent.tools.forecasters as forecasters
+from agent.cache import RESULT_CACHE
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(3)
+    t = np.arange(150)
+    return (np.cumsum(rng.normal(size=150)) + 4 * np.sin(t / 5)).tolist()
+
+
+def _set_modes(monkeypatch, on):
+    monkeypatch.setattr(forecasters, "ARIMA_PARALLEL", on)
+    monkeypatch.setattr(ensemble, "ENSEMBLE_CONCURRENT", on)
+    monkeypatch.setattr(ensemble, "ENSEMBLE_LAZY", on)
+    monkeypatch.setattr(reasoner, "REASONER_CONCURRENT", on)
+
+
+def _run_reasoner(series):
+    RESULT_CACHE.clear()
+    forecasters.MODEL_CACHE.clear()
+    return reasoner.TSReasoner().predict(series, steps=12)
+
+
+def test_defaults_come_from_module_switches(monkeypatch):
+    _set_modes(monkeypatch, True)
+    assert reasoner.TSReasoner().concurrent is True
+    _set_modes(monkeypatch, False)
+    assert reasoner.TSReasoner().concurrent is False
+
+
+def test_arima_parallel_default_matches_sequential(series, monkeypatch):
+    monkeypatch.setattr(forecasters, "ARIMA_PARALLEL", True)
+    forecasters.MODEL_CACHE.clear()
+    fast = forecasters.arima_forecast(series, 10)
+    forecasters.MODEL_CACHE.clear()
+    assert fast == forecasters.arima_forecast(series, 10, parallel=False)
+
+
+def test_reasoner_with_fast_paths_matches_plain_run(series, monkeypatch):
+    _set_modes(monkeypatch, False)
+    plain = _run_reasoner(series)
+    _set_modes(monkeypatch, True)
+    fast = _run_reasoner(series)
+
+    assert fast["predictions"] == plain["predictions"]
+    assert fast["confidence"] == plain["confidence"]
+    actions = lambda r: [s["action"] for s in r["trajectory"]["steps"]]
+    assert actions(fast) == actions(plain)
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from agent.tools.profiling import profile_series
+
+
+@pytest.mark.parametrize("offset", [0.0, 1e6])
+def test_profile_matches_separate_passes(offset):
+    rng = np.random.default_rng(9)
+    t = np.arange(500)
+    y = offset + 0.02 * t + rng.standard_t(4, size=500)
+    y[[40, 300]] += 25
+    p = profile_series(y)
+
+    fit = stats.linregress(t, y)
+    expected = {
+        "mean": np.mean(y), "std": np.std(y), "min": y.min(), "max": y.max(),
+        "slope": fit.slope, "intercept": fit.intercept, "r_squared": fit.rvalue ** 2,
+        "skewness": stats.skew(y), "kurtosis": stats.kurtosis(y),
+    }
+    for key, value in expected.items():
+        assert p[key] == pytest.approx(value, rel=1e-6, abs=1e-6), key
+    assert p["anomaly_count"] == np.count_nonzero(np.abs(y - y.mean()) > 3 * y.std())
+    assert p["anomaly_count"] >= 2
+
+
+def test_profile_of_constant_and_empty_series():
+    flat = profile_series([3.0] * 10)
+    assert (flat["std"], flat["slope"], flat["r_squared"], flat["anomaly_count"]) == (0, 0, 0, 0)
+    assert profile_series([])["n"] == 0
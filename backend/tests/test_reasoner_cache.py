@@ -0,0 +1,44 @@
+import time
+
+import numpy as np
+
+import agent.reasoner as reasoner
+from agent.cache import RESULT_CACHE
+
+
+def _series():
+    return np.cumsum(np.random.default_rng(5).normal(size=80)).tolist()
+
+
+def test_failed_tool_is_not_cached(monkeypatch):
+    def boom(data):
+        raise RuntimeError("tool failed")
+
+    tools = dict(reasoner.ALL_TOOLS)
+    tools["trend_analysis"] = dict(tools["trend_analysis"], fn=boom)
+    RESULT_CACHE.clear()
+    engine = reasoner.TSReasoner(concurrent=False)
+    engine.tools = tools
+    result = engine.predict(_series(), steps=5)
+    assert result["predictions"]
+    assert RESULT_CACHE.stats()["entries"] == 0
+
+
+def test_timed_out_tool_is_not_cached():
+    def slow(data):
+        time.sleep(0.5)
+        return {"tool": "trend_analysis"}
+
+    tools = dict(reasoner.ALL_TOOLS)
+    tools["trend_analysis"] = dict(tools["trend_analysis"], fn=slow)
+    RESULT_CACHE.clear()
+    engine = reasoner.TSReasoner(concurrent=True, tool_timeout=0.1)
+    engine.tools = tools
+    engine.predict(_series(), steps=5)
+    assert RESULT_CACHE.stats()["entries"] == 0
+
+
+def test_complete_analysis_is_cached():
+    RESULT_CACHE.clear()
+    reasoner.TSReasoner(concurrent=True).predict(_series(), steps=5)
+    assert RESULT_CACHE.stats()["entries"] == 2  # analysis + full result
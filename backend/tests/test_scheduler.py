@@ -0,0 +1,35 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from agent.scheduler import run_dag
+
+
+def _sleeper(seconds):
+    def fn(data):
+        time.sleep(seconds)
+        return seconds
+    return {"fn": fn}
+
+
+def test_tool_timeout_counts_from_start_not_submission():
+    # One thread: the third tool waits ~0.6 s in the queue but runs for 0.3 s
+    tools = {name: _sleeper(0.3) for name in ("a", "b", "c")}
+    failed = set()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        results = run_dag(tools, None, ["a", "b", "c"], pool=pool,
+                          tool_timeout=0.5, failed=failed)
+    assert set(results) == {"a", "b", "c"}
+    assert not failed
+
+
+def test_running_tool_still_times_out():
+    tools = {"slow": _sleeper(1.0), "fast": _sleeper(0.0)}
+    failed = set()
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = run_dag(tools, None, ["slow", "fast"], pool=pool,
+                          tool_timeout=0.2, failed=failed)
+        elapsed = time.monotonic() - start
+    assert results == {"fast": 0.0}
+    assert failed == {"slow"}
+    assert elapsed < 0.8
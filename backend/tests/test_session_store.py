@@ -0,0 +1,35 @@
+import pytest
+
+from models.session_store import (CHAT_STORE_RETRIES, FileSessionStore, SessionStore,
+                                  session_key)
+
+
+class _FlakyStore(FileSessionStore):
+    def _write_row(self, session_id, payload, rev, updated_at):
+        if session_id == "bad":
+            raise ValueError("value too long for type character varying(128)")
+        super()._write_row(session_id, payload, rev, updated_at)
+
+
+def test_session_store_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+
+def test_session_key_is_scoped_and_bounded():
+    assert session_key(1, "default_session") != session_key(2, "default_session")
+    assert len(session_key(1, "x" * 10000)) == len(session_key(1, "y"))
+    assert session_key(1, 123) == session_key(1, "123")
+
+
+def test_failing_row_does_not_block_others(tmp_path):
+    store = _FlakyStore(directory=str(tmp_path), flush_interval=60)
+    store.save("bad", {"messages": []}, "r1")
+    store.save("good", {"messages": [["h", "hi"]]}, "r2")
+    store.flush()
+    assert store._read("good")[1] == "r2"
+    assert "bad" in store._pending
+
+    for _ in range(CHAT_STORE_RETRIES):
+        store.flush()
+    assert store._pending == {} and store._failures == {}
@@ -0,0 +1,50 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import models.agent_chain as agent_chain
+from agent.cache import RESULT_CACHE
+
+
+@pytest.fixture
+def one_thread(monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(agent_chain, "_llm_pool", pool)
+    monkeypatch.setattr(agent_chain, "_llm_slots", threading.BoundedSemaphore(1))
+    yield
+    pool.shutdown(wait=True)
+
+
+def _series():
+    return (np.arange(40) + np.random.default_rng(4).normal(size=40)).tolist()
+
+
+def test_busy_pool_rejects_instead_of_queueing(one_thread, monkeypatch):
+    release = threading.Event()
+    hung = agent_chain._submit_llm(release.wait)
+    assert agent_chain._submit_llm(lambda: 1) is None
+
+    monkeypatch.setattr(agent_chain, "COTP_DEADLINE", 5.0)
+    RESULT_CACHE.clear()
+    start = time.perf_counter()
+    result = agent_chain.smart_predict(_series(), steps=5, async_llm=True)
+    assert time.perf_counter() - start < 2.0
+    assert result["confidence"] <= 0.3 and len(result["predictions"]) == 5
+    assert RESULT_CACHE.stats()["entries"] == 1  # only the FAP insights
+
+    release.set()
+    hung.result(timeout=1)
+    assert agent_chain._result_within(agent_chain._submit_llm(lambda: 1), 1.0) == (1, False)
+
+
+def test_timed_out_call_holds_its_thread_until_it_returns(one_thread):
+    release = threading.Event()
+    future = agent_chain._submit_llm(release.wait)
+    assert agent_chain._result_within(future, 0.05) == (None, True)
+    assert agent_chain._submit_llm(lambda: 1) is None
+    release.set()
+    future.result(timeout=1)
+    assert agent_chain._result_within(agent_chain._submit_llm(lambda: 2), 1.0) == (2, False)
@@ -0,0 +1,120 @@
+import numpy as np
+
+import agent.tools.statistical as statistical
+
+
+def _shifted(n, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.normal(size=n)
+    for cp, shift in zip((n // 5, n // 2, 4 * n // 5), (3.0, -2.5, 4.0)):
+        y[cp:] += shift
+    return y.tolist()
+
+
+def test_pelt_grid_matches_exact(monkeypatch):
+    y = _shifted(6000)
+    exact = statistical.changepoint_detection(y, method="pelt")["changepoints"]
+    monkeypatch.setattr(statistical, "PELT_EXACT_LIMIT", 1000)
+    monkeypatch.setattr(statistical, "PELT_GRID", 500)
+    gridded = statistical.changepoint_detection(y, method="pelt")["changepoints"]
+    assert gridded == exact
+    assert len(exact) == 3
+
+
+def _outlier_labels(y):
+    from sklearn.neighbors import LocalOutlierFactor
+
+    lof = LocalOutlierFactor(n_neighbors=5, contamination=0.05)
+    return sorted(np.where(lof.fit_predict(y.reshape(-1, 1)) == -1)[0].tolist())
+
+
+def test_lof_1d_matches_sklearn_on_distinct_values():
+    rng = np.random.default_rng(1)
+    for n in (20, 120, 465):
+        y = rng.standard_t(3, size=n)
+        assert statistical._lof_1d_outliers(y) == _outlier_labels(y)
+
+
+def test_lof_1d_ties_include_the_whole_k_distance_neighbourhood():
+    # Values on a 0.1 grid: many equal distances and some duplicates
+    rng = np.random.default_rng(5)
+    y = np.round(rng.normal(50, 5, 200), 1)
+    y[3] += 40
+    flagged = statistical._lof_1d_outliers(y)
+    assert 3 in flagged
+    # Copies of a value share one verdict, whatever order the data comes in
+    for i in range(len(y)):
+        same = np.where(y == y[i])[0]
+        assert all((j in flagged) == (i in flagged) for j in same)
+    perm = rng.permutation(len(y))
+    assert sorted(int(perm[j]) for j in statistical._lof_1d_outliers(y[perm])) == flagged
+
+
+def test_anomaly_consensus_keeps_three_voters_and_keys():
+    y = _shifted(300)
+    y[50] += 25.0
+    fast = statistical.anomaly_detection(y)
+    assert fast["isolation_forest_count"] is None
+    assert {"histogram_isolation_count", "robust_z_count"} <= set(fast)
+    arr = np.asarray(y)
+    votes = [set(np.where(np.abs(arr - arr.mean()) > 3 * arr.std())[0].tolist()),
+             set(statistical._histogram_isolation_outliers(arr)),
+             set(statistical._lof_1d_outliers(arr))]
+    expected = sorted(i for i in set().union(*votes) if sum(i in v for v in votes) >= 2)
+    assert fast["consensus_count"] == len(expected)
+    assert 50 in fast["consensus_anomalies"]
+
+    accurate = statistical.anomaly_detection(y, mode="accurate")
+    assert isinstance(accurate["isolation_forest_count"], int)
+    assert "histogram_isolation_count" not in accurate
+
+
+def _loop_mann_kendall(y):
+    n = len(y)
+    s = sum(np.sign(y[j] - y[i]) for i in range(n - 1) for j in range(i + 1, n))
+    _, t = np.unique(y, return_counts=True)
+    var_s = (n * (n - 1) * (2 * n + 5) - np.sum(t * (t - 1) * (2 * t + 5))) / 18.0
+    return int(s), var_s
+
+
+def test_mann_kendall_paths_match_the_pair_loop(monkeypatch):
+    rng = np.random.default_rng(6)
+    # Integer rounding leaves many ties for the variance correction
+    y = np.round(np.cumsum(rng.normal(size=400)) / 3)
+    expected = _loop_mann_kendall(y)
+    pairwise = statistical._mann_kendall_s(y)
+    monkeypatch.setattr(statistical, "_MK_PAIRWISE_MAX", 0)
+    merge_sort = statistical._mann_kendall_s(y)
+    for s, var_s in (pairwise, merge_sort):
+        assert s == expected[0]
+        assert np.isclose(var_s, expected[1])
+    assert expected[1] < 400 * 399 * 805 / 18.0
+
+
+def test_mann_kendall_constant_series_has_no_trend(monkeypatch):
+    monkeypatch.setattr(statistical, "_MK_PAIRWISE_MAX", 0)
+    assert statistical._mann_kendall_s(np.ones(50)) == (0, 0.0)
+    result = statistical.trend_analysis([2.0] * 50)
+    assert result["mann_kendall_z"] == 0 and result["mann_kendall_p"] == 1
+
+
+def test_rolling_std_windows_matches_the_window_loop():
+    y = np.cumsum(np.random.default_rng(7).normal(size=300)) + 1e4
+    win = statistical.volatility_window(len(y))
+    loop = [np.std(y[i - win:i]) for i in range(win, len(y))]
+    assert np.allclose(statistical.rolling_std_windows(y - y.mean(), win), loop)
+    assert len(statistical.rolling_std_windows(y[:win], win)) == 0
+
+
+def test_streaming_volatility_matches_batch():
+    y = 50 + np.cumsum(np.random.default_rng(8).normal(size=400))
+    batch = statistical.volatility_analysis(y.tolist())
+    stream = statistical.StreamingVolatility(window=statistical.volatility_window(len(y)))
+    profile = stream.extend(y).profile()
+    ewma_std = profile.pop("ewma_std")
+    assert profile == batch
+
+    var = None
+    for ret in np.diff(y):
+        var = ret ** 2 if var is None else 0.94 * var + 0.06 * ret ** 2
+    assert ewma_std == round(float(np.sqrt(var)), 4)
@@ -0,0 +1,87 @@
+import io
+import json
+import threading
+
+import numpy as np
+import pytest
+
+import app as app_module
+from utils.auth_utils import generate_token
+
+
+def _events(chunks):
+    for chunk in chunks:
+        text = chunk.decode("utf-8") if isinstance(chunk, bytes) else chunk
+        for block in text.strip().split("\n\n"):
+            lines = dict(line.split(": ", 1) for line in block.splitlines())
+            yield lines["event"], json.loads(lines["data"])
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(app_module, "check_and_consume_chat", lambda user_id: (True, None))
+    monkeypatch.setattr(app_module, "UPLOADS_DIR", str(tmp_path))
+    monkeypatch.setattr(app_module, "smart_predict", lambda data_y, steps: {"ok": True})
+    return app_module.app.test_client()
+
+
+def _upload(client, message=""):
+    y = np.cumsum(np.random.default_rng(0).normal(size=60))
+    csv = "x,y\n" + "\n".join(f"{i},{v:.4f}" for i, v in enumerate(y))
+    return client.post(
+        "/api/agent-upload-predict?stream=1",
+        data={"file": (io.BytesIO(csv.encode()), "series.csv"), "message": message},
+        headers={"Authorization": f"Bearer {generate_token(1)}"},
+        buffered=False,
+    )
+
+
+def test_stream_starts_before_report(client, monkeypatch):
+    release = threading.Event()
+
+    def slow_report(analysis_result):
+        assert release.wait(10)
+        return "# 报告"
+
+    monkeypatch.setattr(app_module, "generate_standalone_report", slow_report)
+    events = _events(_upload(client).response)
+
+    # The chart arrives while the report is still being generated
+    name, payload = next(events)
+    assert name == "analysis" and payload["chart_data"]
+    release.set()
+    rest = list(events)
+    assert [n for n, _ in rest] == ["report", "done"]
+    assert rest[-1][1]["report"] == "# 报告"
+
+
+def test_reasoner_error_is_forwarded(client, monkeypatch):
+    monkeypatch.setattr(app_module, "generate_standalone_report", lambda a: "# 报告")
+
+    class FailingReasoner:
+        def predict_stream(self, data_y, steps):
+            yield "error", "boom"
+
+    monkeypatch.setattr(app_module, "TSReasoner", FailingReasoner)
+    monkeypatch.setattr(app_module, "_should_think", lambda message: True)
+    names = [(n, p) for n, p in _events(_upload(client, "深度思考").response)]
+    assert ("error", {"error": "推理失败: boom"}) in names
+    assert names[-1][0] == "done"
+
+
+def test_reasoner_exception_still_sends_report(client, monkeypatch):
+    monkeypatch.setattr(app_module, "generate_standalone_report", lambda a: "# 报告")
+
+    class CrashingReasoner:
+        def predict_stream(self, data_y, steps):
+            yield "step", {"step": 1}
+            raise RuntimeError("llm down")
+
+    monkeypatch.setattr(app_module, "TSReasoner", CrashingReasoner)
+    monkeypatch.setattr(app_module, "_format_step", lambda payload: payload)
+    monkeypatch.setattr(app_module, "_should_think", lambda message: True)
+    events = list(_events(_upload(client, "深度思考").response))
+    names = [n for n, _ in events]
+    assert ("error", {"error": "推理失败: llm down"}) in events
+    assert "report" in names and names[-1] == "done"
+    assert events[-1][1]["report"] == "# 报告"